@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark of builder.py.
+
+Generates synthetic plugin archives for a set of scenarios, serves them from
+a local HTTP stand-in, and runs the builder against them in a scratch
+directory - first cold (no cache, no manifest), then warm (nothing changed).
+For every run it records wall time, peak RSS, bytes downloaded and plugins
+per second, and writes everything to a JSON file so runs from different
+commits can be compared.
+
+    python benchmarks/bench_build.py
+    python benchmarks/bench_build.py --scenario monorepo --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+BUILDER = os.path.join(ROOT, "builder.py")
+
+from standin import Standin
+from synthetic import make_archive, make_plugin_source
+
+# name -> (repos, files per repo, min file size, max file size, extra binary bytes per repo, single-file sources)
+SCENARIOS = {
+    "many-repos": (60, 8, 1000, 12000, 0, 10),
+    "monorepo": (2, 2500, 1000, 20000, 0, 0),
+    "heavy-assets": (8, 20, 2000, 20000, 24 * 1024 * 1024, 0),
+}
+
+
+def generate(name, www):
+    """Writes the scenario's archives under www and returns the repos.txt paths."""
+    repos, files, min_size, max_size, extra, singles = SCENARIOS[name]
+    paths = []
+    for r in range(repos):
+        filename = f"{name}-{r}.zip"
+        with open(os.path.join(www, filename), "wb") as f:
+            f.write(make_archive(files, seed=r, min_size=min_size, max_size=max_size,
+                                 extra_bytes=extra, prefix=f"{name}-{r}-master"))
+        paths.append(filename)
+    rng = random.Random(len(paths))
+    for s in range(singles):
+        filename = f"{name}-single-{s}.py"
+        with open(os.path.join(www, filename), "w") as f:
+            f.write(make_plugin_source(10000 + s, rng, 3000, style="single"))
+        paths.append(filename)
+    return paths
+
+
+# Linux charges a process with the RSS of whatever exec'd it, so the builder is
+# started from a small launcher rather than from this (archive-holding) process.
+LAUNCHER = """
+import os, subprocess, sys, time
+start = time.perf_counter()
+proc = subprocess.Popen(sys.argv[1:], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+_, status, usage = os.wait4(proc.pid, 0)
+print(time.perf_counter() - start, usage.ru_maxrss, os.waitstatus_to_exitcode(status))
+"""
+
+
+def run_builder(workdir, extra_args):
+    """Runs builder.py in workdir and returns (wall seconds, peak RSS MB, exit status)."""
+    out = subprocess.check_output([sys.executable, "-c", LAUNCHER, sys.executable, BUILDER] + extra_args,
+                                  cwd=workdir, text=True)
+    elapsed, maxrss, status = out.split()
+    peak = int(maxrss) / (1048576 if sys.platform == "darwin" else 1024)
+    return float(elapsed), peak, int(status)
+
+
+def bench_scenario(name, builder_args):
+    results = []
+    with tempfile.TemporaryDirectory(prefix=f"pwnstore-bench-{name}-") as tmp:
+        www = os.path.join(tmp, "www")
+        work = os.path.join(tmp, "work")
+        os.makedirs(www)
+        os.makedirs(work)
+        paths = generate(name, www)
+        archive_bytes = sum(os.path.getsize(os.path.join(www, p)) for p in paths)
+
+        with Standin(www) as server:
+            with open(os.path.join(work, "repos.txt"), "w") as f:
+                f.write("\n".join(server.base_url + p for p in paths) + "\n")
+
+            for phase in ("cold", "warm"):
+                server.reset_counters()
+                elapsed, peak, status = run_builder(work, builder_args)
+                with open(os.path.join(work, "plugins.json"), "r") as f:
+                    plugins = len(json.load(f))
+                results.append({
+                    "scenario": name,
+                    "phase": phase,
+                    "sources": len(paths),
+                    "source_bytes": archive_bytes,
+                    "exit_status": status,
+                    "wall_seconds": round(elapsed, 3),
+                    "peak_rss_mb": round(peak, 1),
+                    "requests": server.requests,
+                    "not_modified": server.not_modified,
+                    "bytes_downloaded": server.bytes_sent,
+                    "plugins": plugins,
+                    "plugins_per_second": round(plugins / elapsed, 1),
+                })
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path, "r") as f:
+        baseline = {(r["scenario"], r["phase"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for r in current:
+        before = baseline.get((r["scenario"], r["phase"]))
+        if not before:
+            continue
+        changes = []
+        for key in ("wall_seconds", "peak_rss_mb", "bytes_downloaded"):
+            if before[key]:
+                changes.append(f"{key} {(r[key] - before[key]) / before[key] * 100:+.0f}%")
+        print(f"  {r['scenario']:<14} {r['phase']:<5} " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline builder benchmark")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--output', default='bench_results.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Previous results file to diff against')
+    parser.add_argument('builder_args', nargs='*', help='Extra arguments for builder.py (after --)')
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenario or sorted(SCENARIOS):
+        print(f"[*] Scenario {name}...")
+        results.extend(bench_scenario(name, args.builder_args))
+
+    print(f"\n{'SCENARIO':<14} | {'PHASE':<5} | {'WALL (s)':<8} | {'RSS (MB)':<8} | {'DOWNLOADED':<11} | {'PLUGINS/s'}")
+    print("-" * 75)
+    for r in results:
+        print(f"{r['scenario']:<14} | {r['phase']:<5} | {r['wall_seconds']:<8} | {r['peak_rss_mb']:<8} | "
+              f"{r['bytes_downloaded'] / 1048576:<8.1f} MB | {r['plugins_per_second']}")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "builder_args": args.builder_args,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[+] Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
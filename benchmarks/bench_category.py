@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark and parity check: precompiled keyword matcher vs. the original
+per-tag loop in detect_category.
+
+Every input is scored by both implementations and the score dicts (values
+and insertion order, which decides ties) must be identical; any mismatch
+exits non-zero. Inputs are the real plugins behind plugins.json when they
+can be fetched, synthetic plugins, and randomised keyword soup built to
+stress overlapping tags, mixed case and Unicode.
+
+    python benchmarks/bench_category.py
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import builder
+from bench_metadata import registry_sources
+from synthetic import make_plugin_source
+
+
+def legacy_category_scores(name, description, code):
+    """The scoring loop detect_category used before the combined matcher."""
+    scores = defaultdict(int)
+    name_lower = name.lower()
+    desc_lower = description.lower() if description else ""
+    code_lower = code.lower()
+
+    for category, tags in builder.KEYWORDS.items():
+        for tag in tags:
+            if tag in name_lower: scores[category] += 10
+            if re.search(r'\b' + re.escape(tag) + r'\b', desc_lower): scores[category] += 3
+            if tag in code_lower[:2000]: scores[category] += 1
+
+    if "ui.set" in code_lower: scores["Display"] += 5
+    if "gpio" in code_lower: scores["Hardware"] += 2
+    return dict(scores)
+
+
+def keyword_soup(rng, length):
+    tags = [tag for tags in builder.KEYWORDS.values() for tag in tags]
+    noise = ["_", " ", ".", "-", "\n", "İ", "ſ", "K", "ui.SET", "GPIO", "x", "é", "2"]
+    parts = []
+    while sum(len(p) for p in parts) < length:
+        part = rng.choice(tags) if rng.random() < 0.6 else rng.choice(noise)
+        if rng.random() < 0.3:
+            part = part.upper()
+        elif rng.random() < 0.2:
+            part = part[:rng.randint(1, len(part))]
+        parts.append(part)
+    return "".join(parts)
+
+
+def build_inputs(args):
+    inputs = []
+    for name, code in registry_sources(args.registry, args.cache_dir):
+        metadata = builder.extract_metadata(code)
+        inputs.append((name, metadata.get('description', ""), code))
+    real = len(inputs)
+
+    rng = random.Random(0)
+    for i in range(args.synthetic):
+        code = make_plugin_source(i, rng, rng.randint(1000, 30000))
+        inputs.append((f"plugin_{i}", builder.extract_metadata(code).get('description', ""), code))
+    for i in range(args.fuzz):
+        inputs.append((keyword_soup(rng, rng.randint(0, 40)), keyword_soup(rng, rng.randint(0, 200)),
+                       keyword_soup(rng, rng.randint(0, 5000))))
+    return inputs, real
+
+
+def best_time(func, inputs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            func(*item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Category classifier parity check and benchmark")
+    parser.add_argument('--registry', default=os.path.join(ROOT, "plugins.json"))
+    parser.add_argument('--cache-dir', default=os.path.join(ROOT, builder.CACHE_DIR))
+    parser.add_argument('--synthetic', type=int, default=300)
+    parser.add_argument('--fuzz', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    inputs, real = build_inputs(args)
+    print(f"[*] {len(inputs)} inputs ({real} real plugins, {args.synthetic} synthetic, {args.fuzz} fuzzed)")
+
+    mismatches = 0
+    for name, description, code in inputs:
+        old = legacy_category_scores(name, description, code)
+        new = builder.category_scores(name, description, code)
+        if list(old.items()) != list(new.items()):
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"[!] Mismatch for {name!r}: {old} != {new}")
+    if mismatches:
+        print(f"[!] Parity FAILED on {mismatches} inputs")
+        sys.exit(1)
+    print("[+] Parity OK: scores and tie order identical on every input\n")
+
+    timed = [item for item in inputs[:real + args.synthetic]] or inputs
+    old = best_time(legacy_category_scores, timed, args.repeat)
+    new = best_time(builder.category_scores, timed, args.repeat)
+    print(f"{'CLASSIFIER':<12} | {'TOTAL (ms)':<10} | {'PER FILE (us)'}")
+    print("-" * 42)
+    print(f"{'per-tag':<12} | {old * 1000:<10.1f} | {old / len(timed) * 1e6:.1f}")
+    print(f"{'combined':<12} | {new * 1000:<10.1f} | {new / len(timed) * 1e6:.1f}")
+    print(f"\nSpeedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
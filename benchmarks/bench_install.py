@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark and parity check: installing one plugin out of a repo zip with HTTP
+Range requests vs. downloading the whole archive.
+
+Serves synthetic archives from the local stand-in - once honouring Range
+requests, once ignoring them - and extracts a few members of each with
+pwnstore.fetch_zip_member. Every result is compared with zipfile's own
+extraction (exits 1 on a mismatch), and requests and bytes transferred are
+reported for both paths. Archives cover the awkward cases: a central
+directory larger than the first tail request, stored members, data prepended
+to the archive, and a ZIP64 end of central directory.
+
+A second table installs from whole archives of growing size while the
+stand-in cuts every first transfer off halfway. Each archive must be resumed
+with a Range request and come out intact. The installing process's peak RSS
+is reported and must stay flat as the archives grow.
+
+    python benchmarks/bench_install.py
+"""
+
+import contextlib
+import hashlib
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, ROOT)
+
+import pwnstore
+from standin import Standin
+from synthetic import make_archive, make_plugin_source
+
+
+def stored_archive():
+    rng = random.Random(7)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as z:
+        for i in range(20):
+            z.writestr(f"stored-master/plugin_{i}.py", make_plugin_source(i, rng, 3000))
+    return buf.getvalue()
+
+
+def zip64_archive():
+    """More entries than a classic end of central directory can count, forcing the ZIP64 records."""
+    rng = random.Random(8)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for i in range(66000):
+            z.writestr(f"z64-master/assets/{i}.txt", "")
+        for i in range(3):
+            z.writestr(f"z64-master/plugin_{i}.py", make_plugin_source(i, rng, 3000))
+    return buf.getvalue()
+
+
+ARCHIVES = {
+    "small-repo": lambda: make_archive(10, seed=1, prefix="small-master"),
+    "assets-20mb": lambda: make_archive(10, seed=2, extra_bytes=20 * 1024 * 1024, prefix="assets-master"),
+    "monorepo": lambda: make_archive(3000, seed=3, prefix="mono-master"),
+    "stored": stored_archive,
+    "prepended": lambda: b"#!/bin/sh\nexit 0\n" * 64 + make_archive(10, seed=4, prefix="sfx-master"),
+    "zip64": zip64_archive,
+}
+
+
+# Sizes of the padding member for the streamed installs
+STREAMED_MB = (1, 32, 128)
+RSS_GROWTH_LIMIT_MB = 16
+
+# Linux charges a process with the RSS of whatever exec'd it, so the install runs
+# under a small launcher rather than straight from this (archive-holding) process.
+LAUNCHER = """
+import os, subprocess, sys
+proc = subprocess.Popen(sys.argv[1:])
+_, status, usage = os.wait4(proc.pid, 0)
+print(usage.ru_maxrss, os.waitstatus_to_exitcode(status))
+"""
+
+STREAMED_INSTALL = """
+import os, sys
+sys.path.insert(0, sys.argv[1])
+import pwnstore
+url, member, plugin_dir = sys.argv[2:]
+pwnstore.CUSTOM_PLUGIN_DIR = plugin_dir
+pwnstore.Downloader.log = lambda self, message: None
+downloader = pwnstore.Downloader()
+archive, path = pwnstore.staging_file("archive.zip"), pwnstore.staging_file("plugin.py")
+downloader.save(url, archive)
+pwnstore.extract_member(archive, member, path)
+print(pwnstore.file_sha256(archive), pwnstore.file_sha256(path))
+"""
+
+
+def streamed_install(url, member, plugin_dir):
+    """Saves the archive at url and extracts member in a fresh process; returns (archive sha256, member sha256, peak RSS MB)."""
+    out = subprocess.check_output([sys.executable, "-c", LAUNCHER, sys.executable, "-c", STREAMED_INSTALL,
+                                   ROOT, url, member, plugin_dir], text=True).split()
+    peak = int(out[2]) / (1048576 if sys.platform == "darwin" else 1024)
+    return out[0], out[1], peak
+
+
+def bench_streamed(www):
+    """Whole-archive installs with the first transfer of each cut off; returns the number of failures."""
+    failures = 0
+    peaks = []
+    print(f"\n{'ARCHIVE':<12} | {'SIZE':>9} | {'REQUESTS':>8} | {'BYTES':>11} | {'PEAK RSS':>9} | {'OK'}")
+    print("-" * 66)
+    for size_mb in STREAMED_MB:
+        name = f"pad-{size_mb}mb"
+        data = make_archive(10, seed=5, extra_bytes=size_mb * 1024 * 1024, prefix=f"{name}-master")
+        with open(os.path.join(www, f"{name}.zip"), "wb") as f:
+            f.write(data)
+        member = members(data)[1]
+        expected = (hashlib.sha256(data).hexdigest(), hashlib.sha256(zipfile.ZipFile(io.BytesIO(data)).read(member)).hexdigest())
+        del data
+        with Standin(www) as server, tempfile.TemporaryDirectory(prefix="pwnstore-plugins-") as plugin_dir:
+            server.faults = {f"/{name}.zip": ["truncate"]}
+            archive_sha, member_sha, peak = streamed_install(f"{server.base_url}{name}.zip", member, plugin_dir)
+            ok = (archive_sha, member_sha) == expected and server.requests == 2
+            failures += not ok
+            peaks.append(peak)
+            print(f"{name:<12} | {size_mb * 1024:>7}KB | {server.requests:>8} | {server.bytes_sent / 1024:>9.1f}KB | "
+                  f"{peak:>7.1f}MB | {'yes' if ok else 'MISMATCH'}")
+    if peaks[-1] - peaks[0] > RSS_GROWTH_LIMIT_MB:
+        print(f"[!] Peak RSS grew by {peaks[-1] - peaks[0]:.1f}MB with the archive size")
+        failures += 1
+    return failures
+
+
+def members(data):
+    names = [n for n in zipfile.ZipFile(io.BytesIO(data)).namelist() if n.endswith(".py")]
+    return [names[0], names[len(names) // 2], names[-1]]
+
+
+def main():
+    failures = 0
+    print(f"{'ARCHIVE':<12} | {'SIZE':>9} | {'MODE':<8} | {'REQUESTS':>8} | {'BYTES':>11} | {'OK'}")
+    print("-" * 66)
+    with tempfile.TemporaryDirectory(prefix="pwnstore-install-") as www:
+        # Downloads are staged next to the installed plugins
+        pwnstore.CUSTOM_PLUGIN_DIR = os.path.join(www, "plugins")
+        for name, build in ARCHIVES.items():
+            data = build()
+            with open(os.path.join(www, f"{name}.zip"), "wb") as f:
+                f.write(data)
+            expected = {m: zipfile.ZipFile(io.BytesIO(data)).read(m) for m in members(data)}
+
+            for ranges in (True, False):
+                with Standin(www, ranges=ranges) as server:
+                    ok = True
+                    for member, content in expected.items():
+                        path = pwnstore.staging_file("bench.py")
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            pwnstore.fetch_zip_member(f"{server.base_url}{name}.zip", member, len(data), pwnstore.Downloader(), path)
+                        with open(path, "rb") as f:
+                            ok &= f.read() == content
+                        os.unlink(path)
+                    failures += not ok
+                    per_install = server.bytes_sent / len(expected)
+                    print(f"{name:<12} | {len(data) / 1024:>7.0f}KB | {'range' if ranges else 'full':<8} | "
+                          f"{server.requests / len(expected):>8.1f} | {per_install / 1024:>9.1f}KB | {'yes' if ok else 'MISMATCH'}")
+        failures += bench_streamed(www)
+
+    if failures:
+        print(f"\n[!] {failures} failures")
+        sys.exit(1)
+    print("\n[+] Range extraction matches zipfile on every archive; streamed installs resume intact in flat memory")
+
+
+if __name__ == "__main__":
+    main()
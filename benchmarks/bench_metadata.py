@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: single-pass metadata extraction vs. the old whole-file regexes.
+
+Runs both extractors over real plugin sources and reports time per file and
+every file where the results differ. Sources come from --plugins-dir, or are
+pulled from the archives referenced by plugins.json (through the builder's
+download cache, so reruns are offline). Without either, synthetic plugins
+are used instead.
+
+    python benchmarks/bench_metadata.py
+    python benchmarks/bench_metadata.py --plugins-dir /usr/local/share/pwnagotchi/custom-plugins
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zipfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import builder
+from synthetic import make_plugin_source
+
+
+def legacy_metadata(code):
+    """What parse_python_content extracted before the tokenizer: three full-file regex passes."""
+    found = {}
+    for key, (pattern, group) in builder.METADATA_PATTERNS.items():
+        match = pattern.search(code)
+        if match:
+            found[key] = match.group(group)
+    return found
+
+
+def registry_sources(registry_path, cache_dir):
+    """Yields (name, code) for every plugin in the registry, downloading each archive once."""
+    if not os.path.exists(registry_path):
+        print(f"[!] {registry_path} not found")
+        return
+    with open(registry_path, "r") as f:
+        registry = json.load(f)
+    cache = builder.ArchiveCache(cache_dir)
+    by_url = {}
+    for p in registry:
+        by_url.setdefault(p['download_url'], []).append(p)
+    for url, plugins in by_url.items():
+        try:
+            body, _, _ = cache.get(url, 30)
+            body = body or cache.open(url)
+        except Exception as e:
+            print(f"[!] Skipping {url}: {e}")
+            continue
+        with body:
+            if not url.endswith(".zip"):
+                yield plugins[0]['name'], body.read().decode('utf-8', errors='ignore')
+                continue
+            with zipfile.ZipFile(body) as z:
+                for p in plugins:
+                    try:
+                        yield p['name'], z.read(p['path_inside_zip']).decode('utf-8', errors='ignore')
+                    except KeyError:
+                        pass
+
+
+def load_sources(args):
+    if args.plugins_dir:
+        for name in sorted(os.listdir(args.plugins_dir)):
+            if name.endswith(".py"):
+                with open(os.path.join(args.plugins_dir, name), "r", errors="ignore") as f:
+                    yield name, f.read()
+        return
+    yield from registry_sources(args.registry, args.cache_dir)
+
+
+def best_time(func, sources, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, code in sources:
+            func(code)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metadata extractor micro-benchmark")
+    parser.add_argument('--registry', default=os.path.join(ROOT, "plugins.json"))
+    parser.add_argument('--cache-dir', default=os.path.join(ROOT, builder.CACHE_DIR))
+    parser.add_argument('--plugins-dir', help='Use the .py files in this directory instead of the registry')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sources = list(load_sources(args))
+    if not sources:
+        print("[!] No real plugin sources available (offline?), using 200 synthetic plugins")
+        rng = random.Random(0)
+        sources = [(f"synthetic_{i}", make_plugin_source(i, rng, rng.randint(1000, 60000))) for i in range(200)]
+
+    total_bytes = sum(len(code) for _, code in sources)
+    print(f"[*] {len(sources)} files, {total_bytes / 1024:.0f} KB of source\n")
+
+    old = best_time(legacy_metadata, sources, args.repeat)
+    new = best_time(builder.extract_metadata, sources, args.repeat)
+    print(f"{'EXTRACTOR':<12} | {'TOTAL (ms)':<10} | {'PER FILE (us)'}")
+    print("-" * 42)
+    print(f"{'regex':<12} | {old * 1000:<10.1f} | {old / len(sources) * 1e6:.1f}")
+    print(f"{'single-pass':<12} | {new * 1000:<10.1f} | {new / len(sources) * 1e6:.1f}")
+    print(f"\nSpeedup: {old / new:.2f}x")
+
+    differences = [(name, legacy_metadata(code), builder.extract_metadata(code)) for name, code in sources]
+    differences = [d for d in differences if d[1] != d[2]]
+    print(f"\n{len(differences)} files differ (regex -> single-pass):")
+    for name, before, after in differences:
+        for key in sorted(set(before) | set(after)):
+            if before.get(key) != after.get(key):
+                print(f"  {name:<25} {key:<12} {before.get(key)!r:.40} -> {after.get(key)!r:.40}")
+
+
+if __name__ == "__main__":
+    main()
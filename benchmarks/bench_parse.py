@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: process-pool parsing of a large synthetic archive.
+
+Times BuildContext.parse over every .py member of a synthetic monorepo at
+increasing worker counts and checks that each run returns exactly the
+serial result.
+
+    python benchmarks/bench_parse.py --files 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import builder
+from synthetic import make_archive, archive_candidates
+
+
+def worker_counts(limit):
+    counts = [1]
+    while counts[-1] * 2 <= limit:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != limit:
+        counts.append(limit)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse-stage scaling benchmark")
+    parser.add_argument('--files', type=int, default=5000, help='Python files in the synthetic archive')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per worker count (best is reported)')
+    args = parser.parse_args()
+
+    print(f"[*] Building synthetic archive with {args.files} files...")
+    candidates = archive_candidates(make_archive(args.files, seed=1))
+    source_bytes = sum(len(c[0]) for c in candidates)
+    print(f"[*] {len(candidates)} candidates, {source_bytes / 1048576:.1f} MB of source\n")
+
+    expected = None
+    baseline = None
+    print(f"{'WORKERS':<8} | {'BEST (s)':<9} | {'FILES/s':<9} | {'SPEEDUP'}")
+    print("-" * 45)
+    for workers in worker_counts(args.max_workers):
+        ctx = builder.BuildContext(parse_workers=workers)
+        try:
+            ctx.parse(candidates[:builder.PARALLEL_PARSE_MIN])  # Start the workers before timing
+            best = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = ctx.parse(candidates)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        finally:
+            ctx.close()
+
+        if expected is None:
+            expected, baseline = result, best
+        elif result != expected:
+            print(f"[!] Results with {workers} workers differ from the serial run")
+            sys.exit(1)
+        print(f"{workers:<8} | {best:<9.3f} | {len(candidates) / best:<9.0f} | {baseline / best:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
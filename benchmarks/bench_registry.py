@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bytes on the wire and decode+parse time for each registry variant.
+
+Compares what a device downloads and parses today (indented plugins.json)
+with the minified, gzip and zstd variants the builder publishes. Only needs
+the standard library (plus zstandard for the .zst row), so it can be copied
+to a Pi and run there together with a plugins.json:
+
+    python benchmarks/bench_registry.py
+    python3 bench_registry.py --registry plugins.json --scale 10
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def scaled(plugins, factor):
+    """Registry with every plugin repeated factor times under distinct names, to model growth."""
+    out = []
+    for i in range(factor):
+        for p in plugins:
+            out.append(dict(p, name=f"{p['name']}_{i}" if i else p['name']))
+    return out
+
+
+def variants(plugins):
+    """name -> (bytes, decode function) for every variant the builder publishes."""
+    minified = json.dumps(plugins, separators=(",", ":")).encode()
+    result = {
+        "plugins.json": (json.dumps(plugins, indent=2).encode(), lambda data: data),
+        "plugins.min.json": (minified, lambda data: data),
+        "plugins.min.json.gz": (gzip.compress(minified, 9, mtime=0), gzip.decompress),
+    }
+    if zstandard:
+        result["plugins.min.json.zst"] = (zstandard.ZstdCompressor(level=19).compress(minified),
+                                          zstandard.ZstdDecompressor().decompress)
+    return result
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registry variant size and parse benchmark")
+    parser.add_argument('--registry', default=os.path.join(ROOT, "plugins.json"), help='plugins.json to measure')
+    parser.add_argument('--scale', type=int, default=1, help='Repeat every plugin this many times')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    with open(args.registry, "r") as f:
+        plugins = scaled(json.load(f), max(1, args.scale))
+
+    print(f"[*] {len(plugins)} plugins on {platform.machine()} / Python {platform.python_version()}")
+    if not zstandard:
+        print("[*] zstandard not installed, skipping .zst")
+
+    results = variants(plugins)
+    baseline_size = len(results["plugins.json"][0])
+    baseline_time = None
+    print(f"\n{'VARIANT':<22} | {'BYTES':>9} | {'vs plugins.json':>15} | {'DECODE+PARSE':>12}")
+    print("-" * 68)
+    for name, (data, decode) in results.items():
+        elapsed = best_time(lambda: json.loads(decode(data)), args.repeat)
+        baseline_time = baseline_time or elapsed
+        print(f"{name:<22} | {len(data):>9} | {len(data) / baseline_size * 100:>14.1f}% | "
+              f"{elapsed * 1000:>9.2f} ms ({elapsed / baseline_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ranked search over the prebuilt index vs. the old linear substring scan.
+
+Builds synthetic registries of increasing size from the vocabulary of the real
+plugins.json, indexes them with builder.build_search_index, and times the CLI's
+rank_search for exact, prefix, typo and multi-word queries - returning every
+hit, and just the top 20 a screen shows - next to the scan search_plugins
+used to do.
+
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --sizes 1000,10000,50000
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+import builder
+import pwnstore
+
+QUERIES = ["gps", "hand", "handshkae", "display battery", "zzzz"]
+
+
+def synthetic_registry(count, seed=0):
+    """count plugins whose names and descriptions reuse words from the real registry."""
+    with open(os.path.join(ROOT, "plugins.json"), "r") as f:
+        real = json.load(f)
+    words = sorted({w for p in real for w in re.findall(r"[a-z]+", (p['name'] + " " + p['description']).lower()) if len(w) > 2})
+    authors = sorted({p['author'] for p in real})
+    rng = random.Random(seed)
+    plugins = []
+    for i in range(count):
+        name = "_".join(rng.sample(words, 2)) + f"_{i}"
+        plugins.append({
+            "name": name,
+            "version": f"1.{rng.randint(0, 9)}.{rng.randint(0, 9)}",
+            "description": " ".join(rng.choice(words) for _ in range(rng.randint(6, 18))).capitalize(),
+            "author": rng.choice(authors),
+            "category": rng.choice(list(builder.KEYWORDS)),
+        })
+    return sorted(plugins, key=lambda p: p['name'].lower())
+
+
+def linear_search(registry, query):
+    """What search_plugins did before the index."""
+    query = query.lower()
+    return [p for p in registry if query in p['name'].lower() or query in p['description'].lower()]
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index benchmark")
+    parser.add_argument('--sizes', default="100,1000,10000", help='Comma separated registry sizes')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions (best is reported)')
+    args = parser.parse_args()
+
+    print(f"{'PLUGINS':>8} | {'INDEX':>9} | {'GZIP':>8} | {'QUERY':<16} | {'HITS':>5} | {'RANKED (ms)':>11} | {'TOP 20 (ms)':>11} | {'SCAN (ms)':>9}")
+    print("-" * 102)
+    for size in (int(s) for s in args.sizes.split(",")):
+        registry = synthetic_registry(size)
+        raw = json.dumps(builder.build_search_index(registry), separators=(",", ":")).encode()
+        index = json.loads(raw)
+        packed = len(gzip.compress(raw, 9, mtime=0))
+        for query in QUERIES:
+            hits = len(pwnstore.rank_search(index, query))
+            indexed = best_time(lambda: pwnstore.rank_search(index, query), args.repeat)
+            top = best_time(lambda: pwnstore.rank_search(index, query, limit=20), args.repeat)
+            scanned = best_time(lambda: linear_search(registry, query), args.repeat)
+            print(f"{size:>8} | {len(raw) / 1024:>7.0f}KB | {packed / 1024:>6.0f}KB | {query:<16} | {hits:>5} | "
+                  f"{indexed * 1000:>11.3f} | {top * 1000:>11.3f} | {scanned * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
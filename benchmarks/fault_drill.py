@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Fault drill for builder.py's fetch scheduler.
+
+Builds a small synthetic registry cleanly and checks that a warm rebuild
+(every file answered from the parse cache) writes the same bytes, and that
+--shard 1/3 .. 3/3 plus merge matches a single build (and that a merge
+without the shards' blobs/ writes nothing). It then
+rebuilds it while the local stand-in misbehaves - transient 5xx/429 replies, reset connections, truncated
+bodies, a host that never answers, a source that is down for good - and
+checks each run:
+  * transient faults are retried, so the registry comes out unchanged;
+  * a hanging host cannot hold the build past --deadline;
+  * a source that keeps failing is served from the previous build's records.
+Exits 1 if any check fails.
+
+    python benchmarks/fault_drill.py
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUILDER = os.path.join(HERE, "..", "builder.py")
+
+from standin import Standin
+from synthetic import make_archive, make_plugin_source
+
+REPOS = 6
+DEADLINE = 8
+SHARDS = 3
+
+# name -> (faults by repo index, extra builder arguments)
+DRILLS = {
+    # Without the cache every request sends a body, so there is something to truncate
+    "transient": ({0: ["503", "503"], 1: ["reset"], 2: ["truncate"], 3: ["429"]}, ["--no-cache"]),
+    "hanging-host": ({4: "hang"}, ["--deadline", str(DEADLINE)]),
+    "trickling-host": ({5: "slow"}, ["--deadline", str(DEADLINE), "--no-cache"]),
+    "source-down": ({1: "503", 2: "reset"}, ["--retries", "1"]),
+}
+
+
+def run_builder(workdir, extra_args):
+    start = time.perf_counter()
+    status = subprocess.call([sys.executable, BUILDER] + extra_args, cwd=workdir,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return status, time.perf_counter() - start
+
+
+# Must not depend on whether a file was parsed or answered from the parse cache
+OUTPUTS = ("plugins.json", "plugins.min.json", "plugins.manifest.json", "build_manifest.json")
+# Must not depend on whether the sources were built in one run or in shards
+SHARD_OUTPUTS = ("plugins.json", "plugins.manifest.json", "build_manifest.json")
+
+
+def read_bytes(workdir, name):
+    with open(os.path.join(workdir, name), "rb") as f:
+        return f.read()
+
+
+def read_tree(workdir, name):
+    root = os.path.join(workdir, name)
+    return {os.path.relpath(os.path.join(d, f), root): read_bytes(d, f) for d, _, files in os.walk(root) for f in files}
+
+
+def shard_drill(server, www, tmp, check):
+    """Single build vs --shard i/n on separate checkouts, merged with their partials/ and blobs/."""
+    paths = []
+    # Repos share seeds, so the same plugin names turn up in several sources
+    for r in range(7):
+        paths.append(f"shard-{r}.zip")
+        with open(os.path.join(www, paths[-1]), "wb") as f:
+            f.write(make_archive(5, seed=r % 4, prefix=f"shard-{r}-master"))
+    for i in range(2):
+        paths.append(f"plugin_{i}_{i + 1}.py")
+        with open(os.path.join(www, paths[-1]), "w") as f:
+            f.write(make_plugin_source(i + 1, random.Random(100 + i)))
+
+    def checkout(name):
+        work = os.path.join(tmp, name)
+        os.makedirs(work)
+        with open(os.path.join(work, "repos.txt"), "w") as f:
+            f.write("\n".join(server.base_url + p for p in paths) + "\n")
+        return work
+
+    single = checkout("single")
+    status, _ = run_builder(single, [])
+    check(status == 0, "single build")
+
+    merged = checkout("merged")
+    bare = checkout("merged-no-blobs")
+    for i in range(1, SHARDS + 1):
+        work = checkout(f"shard-{i}")
+        status, _ = run_builder(work, ["--shard", f"{i}/{SHARDS}"])
+        check(status == 0, f"shard {i}/{SHARDS}")
+        shutil.copytree(os.path.join(work, "partials"), os.path.join(merged, "partials"), dirs_exist_ok=True)
+        shutil.copytree(os.path.join(work, "partials"), os.path.join(bare, "partials"), dirs_exist_ok=True)
+        shutil.copytree(os.path.join(work, "blobs"), os.path.join(merged, "blobs"), dirs_exist_ok=True)
+
+    status, _ = run_builder(merged, ["merge"])
+    check(status == 0 and all(read_bytes(merged, f) == read_bytes(single, f) for f in SHARD_OUTPUTS)
+          and read_tree(merged, "registry") == read_tree(single, "registry"), "merge matches the single build")
+
+    status, _ = run_builder(bare, ["merge"])
+    check(status != 0 and sorted(os.listdir(bare)) == ["partials", "repos.txt"],
+          "merge without blobs/ exits without writing anything")
+
+
+def load(workdir, name):
+    with open(os.path.join(workdir, name), "r") as f:
+        return json.load(f)
+
+
+def main():
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        print(f"    [{'PASS' if ok else 'FAIL'}] {label}")
+        failures += not ok
+
+    with tempfile.TemporaryDirectory(prefix="pwnstore-drill-") as tmp:
+        www = os.path.join(tmp, "www")
+        base = os.path.join(tmp, "base")
+        os.makedirs(www)
+        os.makedirs(base)
+        paths = []
+        for r in range(REPOS):
+            paths.append(f"drill-{r}.zip")
+            with open(os.path.join(www, paths[-1]), "wb") as f:
+                # Big enough that a trickled body can't finish inside the deadline
+                f.write(make_archive(8, seed=r, extra_bytes=64 * 1024 if r == 5 else 0, prefix=f"drill-{r}-master"))
+
+        with Standin(www) as server:
+            with open(os.path.join(base, "repos.txt"), "w") as f:
+                f.write("\n".join(server.base_url + p for p in paths) + "\n")
+            print("[*] Clean build")
+            status, _ = run_builder(base, [])
+            expected = load(base, "plugins.json")
+            check(status == 0 and len(expected) > 0, f"{len(expected)} plugins")
+
+            print("[*] Warm rebuild (--full, parse cache kept)")
+            warm = os.path.join(tmp, "warm")
+            shutil.copytree(base, warm)
+            status, _ = run_builder(warm, ["--full"])
+            check(status == 0 and all(read_bytes(warm, f) == read_bytes(base, f) for f in OUTPUTS),
+                  "same bytes as the cold build")
+
+            print(f"[*] Sharded build ({SHARDS} shards) and merge")
+            shard_drill(server, www, tmp, check)
+
+            for name, (faults, extra_args) in DRILLS.items():
+                print(f"[*] {name}: {faults}")
+                work = os.path.join(tmp, name)
+                shutil.copytree(base, work)
+                server.faults = {"/" + paths[r]: fault for r, fault in faults.items()}
+                status, elapsed = run_builder(work, extra_args)
+                server.faults = {}
+                report = load(work, "build_report.json")
+                sources = {s['url'].rsplit("/", 1)[-1]: s for s in report['sources']}
+                faulty = [sources[paths[r]] for r in faults]
+
+                check(status == 0, "builder exits cleanly")
+                check(load(work, "plugins.json") == expected, "registry unchanged")
+                if name == "transient":
+                    check(all(s['retries'] > 0 and not s['error'] for s in faulty), "faulty sources recovered by retrying")
+                else:
+                    check(all(s['error'] and s['fallback'] for s in faulty), "faulty sources fell back to previous records")
+                    manifest = load(work, "build_manifest.json")['sources']
+                    check(all(manifest[server.base_url + paths[r]].get('failures') == 1 for r in faults),
+                          "failures counted in the build manifest")
+                if "--deadline" in extra_args:
+                    check(elapsed < DEADLINE + 10, f"finished in {elapsed:.1f}s against a {DEADLINE}s deadline")
+
+    print(f"\n{'[+] All checks passed' if not failures else f'[!] {failures} checks failed'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Local HTTP stand-in for GitHub, used by the offline benchmarks.
+
+Serves files from a directory with strong ETags and Last-Modified, answers
+conditional requests with 304, optionally honours single byte-range requests
+(like raw.githubusercontent.com) or ignores them (like codeload.github.com),
+and counts requests and body bytes sent so benchmarks can report transfer volume.
+
+Faults can be injected per path for the fault drill. `faults[path]` is either a
+list, consumed one entry per request (then the path behaves normally), or a
+single fault applied to every request:
+  "503", "429", ...  reply with that status (429 and 503 carry Retry-After: 1)
+  "reset"            close the connection without answering
+  "hang"             never answer (until the server stops)
+  "truncate"         send the headers and half the body, then close
+  "slow"             trickle the body out, a small chunk every SLOW_INTERVAL seconds
+"""
+
+import hashlib
+import os
+import re
+import socket
+import struct
+import sys
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+SLOW_CHUNK = 1024
+SLOW_INTERVAL = 0.5
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            fault = server.next_fault(self.path.split("?")[0])
+        if fault == "reset":
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.close_connection = True
+            return
+        if fault == "hang":
+            server.stopping.wait()
+            self.close_connection = True
+            return
+        if fault and fault.isdigit():
+            self.send_response(int(fault))
+            if fault in ("429", "503"):
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        path = os.path.join(server.root, self.path.split("?")[0].lstrip("/"))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        stat = os.stat(path)
+        etag = f'"{server.etag(path, stat)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            with server.lock:
+                server.not_modified += 1
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        status, content_range = 200, None
+        match = RANGE.match(self.headers.get("Range", "")) if server.ranges else None
+        if match and (match.group(1) or match.group(2)):
+            first, last = match.groups()
+            if not first:
+                start, end = max(0, len(body) - int(last)), len(body) - 1
+            else:
+                start, end = int(first), min(int(last), len(body) - 1) if last else len(body) - 1
+            if start >= len(body) or start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            status, content_range = 206, f"bytes {start}-{end}/{len(body)}"
+            body = body[start:end + 1]
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/zip" if path.endswith(".zip") else "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        if server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        self.end_headers()
+        if fault == "truncate":
+            body = body[:len(body) // 2]
+            self.close_connection = True
+        if fault == "slow":
+            for i in range(0, len(body), SLOW_CHUNK):
+                if server.stopping.wait(SLOW_INTERVAL):
+                    break
+                self.wfile.write(body[i:i + SLOW_CHUNK])
+        else:
+            self.wfile.write(body)
+        with server.lock:
+            server.bytes_sent += len(body)
+
+
+class Standin(ThreadingHTTPServer):
+    """Threaded stand-in server; use as a context manager to run it in the background."""
+
+    daemon_threads = True
+
+    def __init__(self, root, host="127.0.0.1", port=0, ranges=True):
+        super().__init__((host, port), StandinHandler)
+        self.root = root
+        self.ranges = ranges
+        self.lock = threading.Lock()
+        self.etags = {}
+        self.faults = {}
+        self.stopping = threading.Event()
+        self.reset_counters()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def etag(self, path, stat):
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        if key not in self.etags:
+            with open(path, "rb") as f:
+                self.etags[key] = hashlib.sha256(f.read()).hexdigest()[:20]
+        return self.etags[key]
+
+    def handle_error(self, request, client_address):
+        # Clients giving up on a hanging or trickling response is expected in the fault drill
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def next_fault(self, path):
+        """The fault to inject for this request to path, or None. Call with lock held."""
+        fault = self.faults.get(path)
+        if isinstance(fault, list):
+            return fault.pop(0) if fault else None
+        return fault
+
+    def reset_counters(self):
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,114 @@
+"""
+Synthetic plugin archives for the builder benchmarks.
+Generates GitHub-style repo zips whose .py members vary in size and in how
+they declare their metadata, so the parser sees the same shapes it meets in
+real repositories.
+"""
+
+import io
+import random
+import zipfile
+
+TOPICS = [
+    "gps tracker that logs coordinates to wigle",
+    "discord webhook bot that posts new handshakes",
+    "oled display theme with a clock and weather",
+    "deauth and pmkid attack helper",
+    "ups battery monitor with safe shutdown",
+    "backup of config and handshakes over ssh",
+    "bluetooth tether watchdog",
+    "cpu and memory status on screen",
+]
+
+STYLES = ["double", "single", "triple", "concat", "missing"]
+
+HEADER = """import logging
+import os
+
+import pwnagotchi.plugins as plugins
+import pwnagotchi.ui.fonts as fonts
+"""
+
+BODY = """
+    def on_loaded(self):
+        logging.info("[{name}] loaded with %s", self.options)
+        self.interval = self.options.get('interval', 60)
+
+    def on_ui_update(self, ui):
+        ui.set('{name}', str(self.counter))
+
+    def helper_{n}(self, value):
+        # generated filler to reach the requested file size
+        total = 0
+        for i in range(value):
+            total += i * {n}
+        return total
+"""
+
+
+def metadata_block(style, version, author, description):
+    if style == "double":
+        desc = f'"{description}, it\'s handy"'
+    elif style == "single":
+        desc = f"'{description}'"
+    elif style == "triple":
+        desc = f'"""\n        {description}.\n        Spans several lines.\n    """'
+    elif style == "concat":
+        half = len(description) // 2
+        desc = f'("{description[:half]}"\n                       "{description[half:]}")'
+    else:
+        return f"    __author__ = '{author}'\n    __license__ = 'GPL3'\n"
+    return (
+        f"    __author__ = '{author}'\n"
+        f"    __version__ = '{version}'\n"
+        f"    __license__ = 'GPL3'\n"
+        f"    __description__ = {desc}\n"
+    )
+
+
+def make_plugin_source(index, rng, target_size=4000, style=None):
+    """Returns the source of one synthetic plugin, padded to roughly target_size bytes."""
+    style = style or rng.choice(STYLES)
+    name = f"plugin_{index}"
+    version = f"{rng.randint(0, 3)}.{rng.randint(0, 9)}.{rng.randint(0, 20)}"
+    author = f"author{rng.randint(1, 50)}"
+    parts = [
+        HEADER,
+        f"\nclass Plugin{index}(plugins.Plugin):\n",
+        metadata_block(style, version, author, rng.choice(TOPICS)),
+    ]
+    n = 0
+    while sum(len(p) for p in parts) < target_size:
+        parts.append(BODY.format(name=name, n=n))
+        n += 1
+    return "".join(parts)
+
+
+def make_archive(file_count, seed=0, min_size=1000, max_size=20000, extra_bytes=0, prefix="repo-master"):
+    """
+    Builds a repo zip in memory and returns its bytes.
+    extra_bytes adds an incompressible non-.py member, like the firmware
+    images and wordlists real repositories carry.
+    """
+    rng = random.Random(seed)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"{prefix}/README.md", "# Synthetic plugins\n")
+        z.writestr(f"{prefix}/__init__.py", "")
+        for i in range(file_count):
+            source = make_plugin_source(i, rng, rng.randint(min_size, max_size))
+            z.writestr(f"{prefix}/plugin_{seed}_{i}.py", source)
+        if extra_bytes:
+            z.writestr(f"{prefix}/firmware.bin", rng.randbytes(extra_bytes), compress_type=zipfile.ZIP_STORED)
+    return buf.getvalue()
+
+
+def archive_candidates(data, origin_url="http://bench.local/repo.zip"):
+    """Extracts the parser inputs from an archive the same way process_zip_url does."""
+    candidates = []
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        for filename in z.namelist():
+            if filename.endswith(".py") and "__init__" not in filename and "/." not in filename:
+                code = z.read(filename).decode('utf-8', errors='ignore')
+                candidates.append((code, filename.split("/")[-1], origin_url, filename))
+    return candidates
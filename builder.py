@@ -2,18 +2,107 @@
 import requests
 import json
 import re
-import io
 import zipfile
 import os
 import logging
-from collections import defaultdict
+import argparse
+import ast
+import io
+import tokenize
+import threading
+import hashlib
+import inspect
+import time
+import sys
+import warnings
+import tempfile
+import resource
+import multiprocessing
+import sqlite3
+import socket
+import gzip
+import random
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+# Optional: publishes a .zst variant of the registry when installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # --- CONFIGURATION ---
 INPUT_FILE = "repos.txt"
 OUTPUT_FILE = "plugins.json"
 
+# Fetch concurrency (overridable with --workers / --per-host)
+MAX_WORKERS = 8       # Downloads in flight across all hosts
+PER_HOST_LIMIT = 4    # Downloads in flight against a single host
+
+# Fetch scheduling (overridable with --deadline / --retries)
+BUILD_DEADLINE = 20 * 60   # Seconds for all downloads; sources still unfetched then fall back
+CONNECT_TIMEOUT = 10
+ZIP_READ_TIMEOUT = 30
+RAW_READ_TIMEOUT = 15
+MAX_RETRIES = 3            # Extra attempts per source after a retryable failure
+BACKOFF_BASE = 1.0         # Seconds; doubled every attempt, with full jitter
+BACKOFF_MAX = 30.0
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+FALLBACK_MAX_FAILURES = 7  # Consecutive failed builds a source's previous records are kept for
+
+# Parse concurrency (overridable with --parse-workers; 1 parses in-process)
+PARSE_WORKERS = os.cpu_count() or 1
+PARALLEL_PARSE_MIN = 16   # Archives with fewer candidates are parsed inline, IPC isn't worth it
+
+# Conditional-GET download cache (overridable with --cache-dir / --no-cache)
+CACHE_DIR = ".cache/archives"
+CACHE_MAX_AGE_DAYS = 14                 # Drop entries not used for this long
+CACHE_MAX_BYTES = 512 * 1024 * 1024     # Then trim least recently used entries to fit
+
+# Memory bounds (overridable with --max-archive-mb / --max-member-kb)
+MAX_ARCHIVE_BYTES = 200 * 1024 * 1024   # Sources larger than this are skipped
+MAX_MEMBER_BYTES = 1024 * 1024          # .py members larger than this are not decompressed
+CHUNK_SIZE = 64 * 1024
+
+# Incremental builds: per-source content hash and the plugins it produced
+MANIFEST_FILE = "build_manifest.json"
+
+# Parse results of individual .py files keyed by content hash (disabled by --no-cache)
+PARSE_CACHE_FILE = ".cache/parsed.sqlite3"
+
+# Per-source timings and counts for the run, written next to OUTPUT_FILE
+REPORT_FILE = "build_report.json"
+
+# Sharded copy of OUTPUT_FILE so clients can fetch only what a command needs
+REGISTRY_DIR = "registry"
+INDEX_FIELDS = ("name", "version", "category", "author")
+SHARD_NAME = re.compile(r'^[a-zA-Z0-9_-]+$')   # Same rule the CLI applies to plugin names
+
+# Inverted search index (registry/search.json); fields in posting order with their ranking weights
+SEARCH_FIELDS = (("name", 3), ("author", 2), ("description", 1))
+SEARCH_TOKEN = re.compile(r"[a-z0-9]+")
+SEARCH_DOC_FIELDS = ("name", "version", "category", "author", "description")   # Enough to show a result
+
+# Minified and precompressed copies of OUTPUT_FILE, listed with size and sha256 in ARTIFACT_MANIFEST
+MIN_OUTPUT_FILE = "plugins.min.json"
+ARTIFACT_MANIFEST = "plugins.manifest.json"
+ZSTD_LEVEL = 19
+
+# Every plugin file published on its own as blobs/<sha256>.py, so installs skip the repo archive
+BLOB_DIR = "blobs"
+
+# Patches between consecutive registry revisions, so devices can skip the full download
+DELTA_DIR = "deltas"
+DELTA_KEEP = 30   # Patches older than this many revisions are pruned
+
+# Partial results of `--shard i/n` builds, combined by `builder.py merge`
+PARTIAL_DIR = "partials"
+
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+# Plugin strings like '\d' are evaluated while reading metadata; their escape warnings are just noise
+warnings.filterwarnings("ignore", message="invalid escape sequence")
 
 # --- SMART CATEGORY DICTIONARY ---
 KEYWORDS = {
@@ -25,39 +114,287 @@ KEYWORDS = {
     'System': ['backup', 'ssh', 'log', 'update', 'fix', 'clean', 'config', 'manage', 'util', 'internet', 'wifi', 'connection']
 }
 
-def detect_category(name, description, code):
-    scores = defaultdict(int)
-    name_lower = name.lower()
-    desc_lower = description.lower() if description else ""
+CODE_PREFIX_CHARS = 2000   # Only the top of a file counts towards keyword hits
+
+class KeywordMatcher:
+    """Every KEYWORDS tag compiled once into a trie-shaped regex; hits per alphanumeric run are memoized."""
+
+    MEMO_LIMIT = 50000
+
+    def __init__(self, keywords):
+        tags = sorted({tag for tags in keywords.values() for tag in tags})
+        self.tags = tags
+        self.pattern = re.compile("(?=(" + self._trie_regex(tags) + "))")
+        self.implied = {tag: frozenset(other for other in tags if tag.startswith(other)) for tag in tags}
+        self.memo = {}
+        alnum = all(re.fullmatch(r"[a-z0-9]+", tag) for tag in tags)
+        self.runs = re.compile(r"[a-z0-9]{%d,}" % min(map(len, tags))) if alnum else None
+        # \btag\b is a whole-word match when tags are pure word characters
+        self.whole_words = all(re.fullmatch(r"\w+", tag) for tag in tags)
+
+    @staticmethod
+    def _trie_regex(words):
+        """Alternation with shared prefixes factored out; optional tails are greedy, so the longest tag wins."""
+        trie = {}
+        for word in words:
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        def emit(node):
+            alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+            if not alts:
+                return ""
+            body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+            return "(?:" + body + ")?" if "" in node else body
+
+        return emit(trie)
+
+    def _scan(self, text):
+        found = set()
+        for longest in set(self.pattern.findall(text)):
+            found |= self.implied[longest]
+        return frozenset(found)
+
+    def substrings(self, text):
+        """Tags occurring anywhere in text (which should already be lowercase)."""
+        if self.runs is None:
+            return self._scan(text)
+        found = set()
+        for run in set(self.runs.findall(text)):
+            hits = self.memo.get(run)
+            if hits is None:
+                hits = self._scan(run)
+                if len(self.memo) >= self.MEMO_LIMIT:
+                    self.memo.clear()
+                self.memo[run] = hits
+            if hits:
+                found |= hits
+        return found
+
+    def words(self, text):
+        """Tags occurring in text as whole words."""
+        if self.whole_words:
+            return set(re.findall(r"\w+", text)).intersection(self.tags)
+        return {tag for tag in self.tags if re.search(r'\b' + re.escape(tag) + r'\b', text)}
+
+CATEGORY_MATCHER = KeywordMatcher(KEYWORDS)
+
+def category_scores(name, description, code):
+    """Keyword score per category, in the order categories first scored (which breaks ties)."""
     code_lower = code.lower()
+    name_hits = CATEGORY_MATCHER.substrings(name.lower())
+    desc_hits = CATEGORY_MATCHER.words(description.lower() if description else "")
+    code_hits = CATEGORY_MATCHER.substrings(code_lower[:CODE_PREFIX_CHARS])
 
+    scores = {}
     for category, tags in KEYWORDS.items():
-        for tag in tags:
-            if tag in name_lower: scores[category] += 10
-            if re.search(r'\b' + re.escape(tag) + r'\b', desc_lower): scores[category] += 3
-            if tag in code_lower[:2000]: scores[category] += 1
+        score = sum(10 * (tag in name_hits) + 3 * (tag in desc_hits) + (tag in code_hits) for tag in tags)
+        if score: scores[category] = score
 
-    if "ui.set" in code_lower: scores["Display"] += 5
-    if "gpio" in code_lower: scores["Hardware"] += 2
+    if "ui.set" in code_lower: scores["Display"] = scores.get("Display", 0) + 5
+    if "gpio" in code_lower: scores["Hardware"] = scores.get("Hardware", 0) + 2
+    return scores
 
+def detect_category(name, description, code):
+    scores = category_scores(name, description, code)
     if not scores: return "System"
     return max(scores, key=scores.get)
 
+# --- PLUGIN METADATA ---
+METADATA_FIELDS = {'__version__': 'version', '__author__': 'author', '__description__': 'description'}
+
+METADATA_ASSIGNMENT = re.compile(r"(__version__|__author__|__description__)\s*=(?!=)")
+# The common case: one single-line string literal that ends the statement
+SIMPLE_STRING_VALUE = re.compile(r"""[ \t]*([rRuU]?(?:"(?:[^"\\\r\n]|\\.)*"|'(?:[^'\\\r\n]|\\.)*'))[ \t]*(?:#[^\r\n]*)?(?:[;\r\n]|$)""")
+
+# Previous whole-file patterns, now only a fallback for statements the tokenizer rejects
+METADATA_PATTERNS = {
+    'description': (re.compile(r"__description__\s*=\s*([\"'])((?:(?!\1).)*)\1", re.DOTALL), 2),
+    'version': (re.compile(r"__version__\s*=\s*['\"](.+?)['\"]"), 1),
+    'author': (re.compile(r"__author__\s*=\s*['\"](.+?)['\"]"), 1),
+}
+
+def read_string_assignment(tokens):
+    """Consumes `= "..."` from a token stream; returns the string, or None if the value isn't a plain string."""
+    tok = next(tokens, None)
+    if tok is None or tok.type != tokenize.OP or tok.string != '=':
+        return None
+    parts = []
+    in_parens = False
+    for tok in tokens:
+        if tok.type == tokenize.STRING:
+            try:
+                value = ast.literal_eval(tok.string)
+            except (ValueError, SyntaxError):
+                return None  # f-strings and other non-literals
+            if not isinstance(value, str):
+                return None
+            parts.append(value)
+        elif tok.type == tokenize.OP and tok.string == '(' and not parts and not in_parens:
+            in_parens = True
+        elif tok.type in (tokenize.NL, tokenize.COMMENT):
+            continue
+        else:
+            break
+    return "".join(parts) if parts else None
+
+def extract_metadata(code):
+    """Reads the __version__, __author__ and __description__ strings of a plugin in one pass."""
+    found = {}
+    buf = None
+    for match in METADATA_ASSIGNMENT.finditer(code):
+        key = METADATA_FIELDS[match.group(1)]
+        if key in found:
+            continue
+        simple = SIMPLE_STRING_VALUE.match(code, match.end())
+        if simple:
+            literal = simple.group(1)
+            try:
+                value = ast.literal_eval(literal) if "\\" in literal else literal.lstrip("rRuU")[1:-1]
+            except (ValueError, SyntaxError):
+                value = None
+        else:
+            if buf is None:
+                buf = io.StringIO(code)
+            buf.seek(match.start())
+            tokens = tokenize.generate_tokens(buf.readline)
+            next(tokens)  # The dunder itself
+            try:
+                value = read_string_assignment(tokens)
+            except (tokenize.TokenError, SyntaxError):
+                # Unterminated or otherwise untokenizable statement
+                pattern, group = METADATA_PATTERNS[key]
+                legacy = pattern.match(code, match.start())
+                value = legacy.group(group) if legacy else None
+        # Version and author must be non-empty, matching the registry's defaults
+        if value is not None and (value or key == 'description'):
+            found[key] = value
+            if len(found) == len(METADATA_FIELDS):
+                break
+    return found
+
+# --- PLUGIN CONFIG SCHEMA ---
+# Same key discovery the CLI used to run on the device after install
+CONFIG_OPTION_ACCESS = re.compile(r"self\.options\s*\[\s*['\"]([^'\"]+)['\"]\s*\]")
+CONFIG_GET_ACCESS = re.compile(r"\.get\(\s*['\"]([^'\"]+)['\"]")
+CONFIG_DATA_CALLS = ('requests.get', 'result.get', 'data.get', 'resp.get', 'json.get')
+CONFIG_IGNORE = {'main', 'plugins', 'enabled', 'name', 'whitelist', 'screen', 'display', 'none', 'false', 'true'}
+QUOTED_ITEM = re.compile(r"['\"]([^'\"]+)['\"]")
+
+def config_keys(code, plugin_name):
+    """Option keys a plugin reads, skipping .get() calls on API responses and other data."""
+    keys = set()
+    for line in code.splitlines():
+        if any(bad in line for bad in CONFIG_DATA_CALLS):
+            continue
+        matches = CONFIG_OPTION_ACCESS.findall(line)
+        if 'config' in line or 'options' in line or 'kwargs' in line:
+            matches += CONFIG_GET_ACCESS.findall(line)
+        for m in matches:
+            if 'http' in m or '/' in m:
+                continue
+            if m not in CONFIG_IGNORE and m != plugin_name and len(m) > 2:
+                keys.add(m)
+    return sorted(keys)
+
+def config_field_type(key):
+    """Type guessed from the option name alone; the web UI derives its hints from the same rules."""
+    name = key.lower()
+    if 'url' in name or 'webhook' in name:
+        return 'url'
+    if any(word in name for word in ('api_key', 'token', 'secret', 'password')):
+        return 'password'
+    if 'enable' in name:
+        return 'select'
+    if any(word in name for word in ('port', 'timeout', 'interval', 'spacing')):
+        return 'number'
+    if 'email' in name or 'mail' in name:
+        return 'email'
+    return 'text'
+
+def config_field(key, code):
+    """Schema entry for one option (type, default, options, description), read from how the plugin uses it."""
+    k = re.escape(key)
+    field = {'key': key, 'type': config_field_type(key), 'description': key.replace('_', ' ').title()}
+    if field['type'] == 'select':
+        field['options'] = ['true', 'false']
+        field['default'] = 'true'
+    enum_found = False
+
+    # Membership tests: self.options['mode'] in ['a', 'b']
+    for pattern in (rf"self\.options(?:\.get)?\(['\"]?{k}['\"]?\)?\s+in\s+\[([^\]]+)\]",
+                    rf"self\.options(?:\.get)?\(['\"]?{k}['\"]?\)?\s+in\s+\(([^\)]+)\)",
+                    rf"['\"]?{k}['\"]?\s+in\s+\[([^\]]+)\]"):
+        match = re.search(pattern, code, re.IGNORECASE)
+        if match:
+            options = QUOTED_ITEM.findall(match.group(1))
+            if 2 <= len(options) <= 15:
+                field.update(type='select', options=options, description=f"Choose from: {', '.join(options)}")
+                enum_found = True
+                break
+
+    # List literals: fields = ['mem', 'cpu', 'temp'] suggests a multiselect
+    if not enum_found:
+        for pattern in (rf"{k}\s*=\s*\[([^\]]+)\]", rf"['\"]({k})['\"].*?\[([^\]]+)\]"):
+            match = re.search(pattern, code)
+            if match:
+                items = QUOTED_ITEM.findall(match.groups()[-1])
+                if len(items) >= 3:
+                    field.update(type='multiselect', options=items, description=f"Available options: {', '.join(items)}")
+                    enum_found = True
+                    break
+
+    # Defaults: self.options.get('key', <default>)
+    for pattern in (rf"self\.options\.get\(['\"]({k})['\"],\s*['\"]([^'\"]+)['\"]",
+                    rf"self\.options\.get\(['\"]({k})['\"],\s*(\d+)",
+                    rf"self\.options\.get\(['\"]({k})['\"],\s*\[([^\]]+)\]",
+                    rf"self\.options\.get\(['\"]({k})['\"],\s*(True|False)"):
+        match = re.search(pattern, code, re.IGNORECASE)
+        if match:
+            field['default'] = match.group(2).strip().strip('"\'')
+            if field['type'] == 'multiselect':
+                items = QUOTED_ITEM.findall(match.group(2))
+                if items:
+                    field['default'] = ','.join(items)
+            break
+
+    # Compared against True/False: a boolean
+    if not enum_found:
+        for pattern in (rf"self\.options\[['\"]({k})['\"]\]\s*(?:==|is)\s*(True|False)", rf"if.*?{k}.*?(True|False)"):
+            if re.search(pattern, code, re.IGNORECASE):
+                field.update(type='select', options=['true', 'false'])
+                field.setdefault('default', 'true')
+                enum_found = True
+                break
+
+    # Descriptions from comments or string mappings
+    for pattern in (rf"#\s*{k}:?\s+(.+)", rf"['\"]({k})['\"]:\s*['\"]([^'\"]+)['\"]", rf"{k}\s*\(['\"]([^'\"]+)['\"]"):
+        match = re.search(pattern, code, re.IGNORECASE)
+        if match:
+            desc = match.groups()[-1].strip()
+            if 10 < len(desc) < 150 and not any(x in desc for x in ('self.', 'def ', 'import ', '()', '[]')):
+                field['description'] = desc
+                break
+    return field
+
+def config_schema(code, plugin_name):
+    """Configuration form for a plugin: one entry per option key, in key order."""
+    return [config_field(key, code) for key in config_keys(code, plugin_name)]
+
 def parse_python_content(code, filename, origin_url, internal_path=None):
     data = {}
     
     try:
-        # --- ROBUST REGEX FIX for Description ---
-        # Captures content between matching quotes ("..." or '...') ignoring internal apostrophes.
-        desc_match = re.search(r"__description__\s*=\s*([\"'])((?:(?!\1).)*)\1", code, re.DOTALL)
-        
-        # Check for version and author (standard regex)
-        version_match = re.search(r"__version__\s*=\s*['\"](.+?)['\"]", code)
-        author_match = re.search(r"__author__\s*=\s*['\"](.+?)['\"]", code)
+        metadata = extract_metadata(code)
 
-        data['version'] = version_match.group(1) if version_match else "0.0.1"
-        data['author'] = author_match.group(1) if author_match else "Unknown"
-        data['description'] = desc_match.group(2).strip() if desc_match else "No description provided."
+        data['version'] = metadata.get('version', "0.0.1")
+        data['author'] = metadata.get('author', "Unknown")
+        data['description'] = metadata['description'].strip() if 'description' in metadata else "No description provided."
+        if "\n" in data['description']:
+            # Triple-quoted descriptions: fold the docstring layout onto one line
+            data['description'] = " ".join(data['description'].split())
         
         # Determine category
         data['category'] = detect_category(filename.replace(".py", ""), data['description'], code)
@@ -72,7 +409,8 @@ def parse_python_content(code, filename, origin_url, internal_path=None):
                 "category": data['category'],
                 "origin_type": "zip" if internal_path else "single",
                 "download_url": origin_url,
-                "path_inside_zip": internal_path
+                "path_inside_zip": internal_path,
+                "config_schema": config_schema(code, filename.replace(".py", ""))
             }
         
     except Exception as e:
@@ -82,57 +420,817 @@ def parse_python_content(code, filename, origin_url, internal_path=None):
         
     return None
 
-def process_zip_url(url):
+def file_fields(data, archive_digest=None, archive_size=None):
+    """Content hash and size of a plugin file and of its archive, for its registry record."""
+    digest = hashlib.sha256(data).hexdigest()
+    fields = {'sha256': digest, 'size': len(data), 'blob_url': f"{BLOB_DIR}/{digest}.py"}
+    if archive_digest:
+        fields['archive_sha256'] = archive_digest
+        fields['archive_size'] = archive_size
+    return fields
+
+def parser_version():
+    """Fingerprint of the parsing logic and the parse cache's row layout; entries from another version are rebuilt."""
+    h = hashlib.sha256()
+    for func in (KeywordMatcher, category_scores, detect_category,
+                 read_string_assignment, extract_metadata, config_keys, config_field_type,
+                 config_field, config_schema, parse_python_content, file_fields, ParseCache):
+        h.update(inspect.getsource(func).encode())
+    h.update(json.dumps(KEYWORDS, sort_keys=True).encode())
+    for pattern in (METADATA_ASSIGNMENT, SIMPLE_STRING_VALUE, CONFIG_OPTION_ACCESS, CONFIG_GET_ACCESS, QUOTED_ITEM):
+        h.update(pattern.pattern.encode())
+    return h.hexdigest()[:16]
+
+class ArchiveCache:
+    """On-disk download cache keyed by URL: raw bodies plus JSON sidecars with validators and sha256."""
+
+    def __init__(self, root, max_age_days=CACHE_MAX_AGE_DAYS, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, key + ".body"), os.path.join(self.root, key + ".json")
+
+    def _write_meta(self, path, meta):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _read_meta(self, path):
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, url, timeout, limit=MAX_ARCHIVE_BYTES, stats=None, session=None, deadline=None):
+        """Conditional GET into the cache; returns (body file or None on a 304, meta, not_modified)."""
+        stats = {} if stats is None else stats
+        body_path, meta_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+        headers = {}
+        if meta and os.path.exists(body_path):
+            if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'): headers['If-Modified-Since'] = meta['last_modified']
+
+        with timed_get(url, timeout, stats, headers=headers, session=session) as r:
+            if r.status_code == 304 and headers:
+                stats['cache'] = "hit"
+                meta['used_at'] = time.time()
+                self._write_meta(meta_path, meta)
+                return None, meta, True
+            stats['cache'] = "miss"
+            r.raise_for_status()
+
+            tmp = f"{body_path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    digest, size = stream_to(r, f, limit, stats, deadline)
+                os.replace(tmp, body_path)
+            finally:
+                if os.path.exists(tmp): os.remove(tmp)
+            meta = {
+                'url': url,
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+                'encoding': r.encoding,
+                'sha256': digest,
+                'size': size,
+                'fetched_at': time.time(),
+                'used_at': time.time(),
+            }
+        self._write_meta(meta_path, meta)
+        return self.open(url), meta, False
+
+    def open(self, url):
+        return open(self._paths(url)[0], "rb")
+
+    def evict(self):
+        """Removes entries unused for max_age, then the least recently used until under max_bytes."""
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"): continue
+            meta_path = os.path.join(self.root, name)
+            body_path = meta_path[:-len(".json")] + ".body"
+            meta = self._read_meta(meta_path) or {}
+            size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            entries.append((meta.get('used_at', 0), size, body_path, meta_path))
+
+        now = time.time()
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        removed = 0
+        for used_at, size, body_path, meta_path in entries:
+            if now - used_at <= self.max_age and total <= self.max_bytes:
+                continue
+            for path in (body_path, meta_path):
+                if os.path.exists(path): os.remove(path)
+            total -= size
+            removed += 1
+        if removed:
+            logging.info(f"[*] Cache: evicted {removed} entries, {total / 1048576:.1f} MB kept")
+
+class BuildManifest:
+    """Maps each source URL to its content sha256 and records, so unchanged sources are carried forward."""
+
+    def __init__(self, path, full=False):
+        self.path = path
+        self.parser = parser_version()
+        self.previous = {}
+        self.last = {}   # Every previous entry, whatever parsed it, for sources that fail
+        self.sources = {}
+        self.lock = threading.Lock()
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            self.last = data.get('sources', {})
+            if data.get('parser') == self.parser and not full:
+                self.previous = self.last
+        except (OSError, ValueError) as e:
+            logging.warning(f"[!] Ignoring unreadable manifest {path}: {e}")
+
+    def lookup(self, url, digest):
+        """Returns the previous build's records for url if its content hash is unchanged."""
+        entry = self.previous.get(url)
+        if entry and entry.get('sha256') == digest:
+            return entry['plugins']
+        return None
+
+    def fallback(self, url):
+        """Re-records a failed source's previous records without their hash; None after FALLBACK_MAX_FAILURES builds."""
+        entry = self.last.get(url)
+        failures = entry.get('failures', 0) + 1 if entry else 0
+        if not entry or failures > FALLBACK_MAX_FAILURES:
+            return None
+        self.record(url, None, entry['plugins'], failures)
+        return entry['plugins']
+
+    def record(self, url, digest, plugins, failures=0):
+        with self.lock:
+            self.sources[url] = {'sha256': digest, 'plugins': plugins}
+            if failures:
+                self.sources[url]['failures'] = failures
+
+    def save(self):
+        with open(self.path, "w") as f:
+            # Sort sources (not record keys) so the file doesn't depend on download order
+            sources = {url: self.sources[url] for url in sorted(self.sources)}
+            json.dump({'parser': self.parser, 'sources': sources}, f, indent=2)
+
+def parse_candidate(candidate):
+    """Process-pool entry point; candidate is the (code, filename, origin_url, internal_path) tuple."""
+    return parse_python_content(*candidate)
+
+class ParseCache:
+    """Parse results keyed by (content sha256, filename), shared by every repo and run; origin fields are stored empty."""
+
+    ORIGIN_FIELDS = ("origin_type", "download_url", "path_inside_zip")
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.parser = parser_version()
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("CREATE TABLE IF NOT EXISTS parsed (parser TEXT, digest TEXT, filename TEXT, record TEXT, "
+                            "PRIMARY KEY (parser, digest, filename))")
+            self.db.execute("DELETE FROM parsed WHERE parser != ?", (self.parser,))
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, digest, filename):
+        """Returns (found, record); record is None for files that weren't plugins."""
+        with self.lock:
+            row = self.db.execute("SELECT record FROM parsed WHERE parser = ? AND digest = ? AND filename = ?",
+                                  (self.parser, digest, filename)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            record = json.loads(row[0])
+            self.hits += 1
+        return True, record
+
+    def store(self, entries):
+        """entries: (digest, filename, record) tuples."""
+        rows = []
+        for digest, filename, record in entries:
+            if record is not None:
+                record = {k: None if k in self.ORIGIN_FIELDS else v for k, v in record.items()}
+            rows.append((self.parser, digest, filename, json.dumps(record)))
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?)", rows)
+
+    def close(self):
+        self.db.close()
+
+class BuildReport:
+    """Per-build timeline of phases and per-source stats; times in seconds since start, durations in ms."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.clock = time.perf_counter()
+        self.phases = []
+        self.sources = {}
+        self.lock = threading.Lock()
+
+    def now(self):
+        return round(time.perf_counter() - self.clock, 3)
+
+    def phase(self, name, start):
+        self.phases.append({'name': name, 'start': start, 'end': self.now()})
+
+    def source(self, url):
+        """The stats entry for url, created on first use."""
+        with self.lock:
+            if url not in self.sources:
+                self.sources[url] = {
+                    'url': url, 'kind': "zip" if url.endswith(".zip") else "raw",
+                    'start': None, 'end': None, 'status': None, 'cache': None, 'unchanged': False,
+                    'ttfb_ms': None, 'transfer_ms': None, 'bytes': 0,
+                    'members_scanned': 0, 'members_oversize': 0, 'accepted': 0, 'rejected': 0,
+                    'parse_cache_hits': 0, 'parse_ms': 0.0, 'retries': 0, 'fallback': False, 'error': None,
+                }
+            return self.sources[url]
+
+    def save(self, path, urls, **totals):
+        sources = [self.source(url) for url in dict.fromkeys(urls)]
+        summary = {
+            'sources': len(sources),
+            'failed': sum(1 for s in sources if s['error']),
+            'retries': sum(s.get('retries', 0) for s in sources),
+            'fallbacks': sum(1 for s in sources if s.get('fallback')),
+            'unchanged': sum(1 for s in sources if s['unchanged']),
+            'cache_hits': sum(1 for s in sources if s['cache'] == "hit"),
+            'bytes': sum(s['bytes'] for s in sources),
+            'members_scanned': sum(s['members_scanned'] for s in sources),
+            'accepted': sum(s['accepted'] for s in sources),
+            'parse_ms': round(sum(s['parse_ms'] for s in sources), 1),
+        }
+        summary.update(totals)
+        report = {
+            'generated_at': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started)),
+            'parser': parser_version(),
+            'duration': self.now(),
+            'totals': summary,
+            'timeline': self.phases,
+            'sources': sources,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+class BuildContext:
+    """Shared state for one build run, handed to every fetch worker."""
+
+    def __init__(self, cache=None, manifest=None, max_archive_bytes=MAX_ARCHIVE_BYTES, max_member_bytes=MAX_MEMBER_BYTES, parse_workers=1, parse_cache=None, report=None, blob_dir=None,
+                 deadline=None, retries=MAX_RETRIES, pool_size=PER_HOST_LIMIT):
+        self.report = report or BuildReport()
+        # Seconds from now until downloads stop; None for no limit
+        self.deadline = None if deadline is None else time.monotonic() + deadline
+        self.retries = retries
+        # One keep-alive pool per host, shared by every fetch worker
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(1, pool_size))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.blob_dir = blob_dir
+        if blob_dir: os.makedirs(blob_dir, exist_ok=True)
+        self.cache = cache
+        self.manifest = manifest
+        self.parse_cache = parse_cache
+        self.max_archive_bytes = max_archive_bytes
+        self.max_member_bytes = max_member_bytes
+        self.parse_workers = max(1, parse_workers)
+        self.parse_pool = None
+        if self.parse_workers > 1:
+            # Fetch threads are already running when workers start, so don't fork from this process
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self.parse_pool = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context(method))
+
+    def parse(self, candidates, stats=None):
+        """Parses candidates through the parse cache and, for large batches, the process pool; results keep input order."""
+        stats = {} if stats is None else stats
+        start = time.perf_counter()
+        results = [None] * len(candidates)
+        pending = list(range(len(candidates)))
+        digests = {}
+        if self.parse_cache:
+            pending = []
+            for i, (code, filename, origin_url, internal_path) in enumerate(candidates):
+                digests[i] = hashlib.sha256(code.encode('utf-8', 'surrogatepass')).hexdigest()
+                found, record = self.parse_cache.lookup(digests[i], filename)
+                if not found:
+                    pending.append(i)
+                elif record is not None:
+                    # Overwritten in place, so a hit keeps parse_python_content's field order
+                    results[i] = dict(record, origin_type="zip" if internal_path else "single",
+                                      download_url=origin_url, path_inside_zip=internal_path)
+
+        todo = [candidates[i] for i in pending]
+        if self.parse_pool is None or len(todo) < PARALLEL_PARSE_MIN:
+            parsed = [parse_candidate(c) for c in todo]
+        else:
+            chunksize = max(1, len(todo) // (self.parse_workers * 4))
+            parsed = list(self.parse_pool.map(parse_candidate, todo, chunksize=chunksize))
+
+        for i, record in zip(pending, parsed):
+            results[i] = record
+        if self.parse_cache and pending:
+            self.parse_cache.store((digests[i], candidates[i][1], results[i]) for i in pending)
+
+        stats['parse_ms'] = stats.get('parse_ms', 0) + round((time.perf_counter() - start) * 1000, 1)
+        stats['parse_cache_hits'] = stats.get('parse_cache_hits', 0) + len(candidates) - len(pending)
+        stats['accepted'] = stats.get('accepted', 0) + sum(1 for r in results if r)
+        stats['rejected'] = stats.get('rejected', 0) + sum(1 for r in results if not r)
+        return results
+
+    def timeout(self, read_timeout):
+        """(connect, read) timeouts for one request, cut down to what is left before the deadline."""
+        if self.deadline is None:
+            return CONNECT_TIMEOUT, read_timeout
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("build deadline reached before the download started")
+        return min(CONNECT_TIMEOUT, remaining), min(read_timeout, remaining)
+
+    def close(self):
+        self.session.close()
+        if self.parse_pool: self.parse_pool.shutdown()
+        if self.parse_cache:
+            logging.info(f"[*] Parse cache: {self.parse_cache.hits} hits, {self.parse_cache.misses} parsed")
+            self.parse_cache.close()
+
+class DeadlineExceeded(Exception):
+    """The build deadline passed; never retried."""
+
+def timed_get(url, timeout, stats, headers=None, session=None):
+    """Streaming GET that records time to first byte and the HTTP status in stats."""
+    r = (session or requests).get(url, timeout=timeout, headers=headers, stream=True)
+    stats['status'] = r.status_code
+    stats['ttfb_ms'] = round(r.elapsed.total_seconds() * 1000, 1)
+    return r
+
+def abort_response(r):
+    """Shuts down the socket under a streamed response, failing a read blocked on it."""
+    sock = getattr(getattr(r.raw, 'connection', None), 'sock', None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+def stream_to(r, f, limit, stats=None, deadline=None):
+    """Copies a streamed response into f, refusing bodies over limit and stopping at deadline; returns (sha256, size)."""
+    stats = {} if stats is None else stats
+    start = time.perf_counter()
+    length = r.headers.get('Content-Length')
+    if length and length.isdigit() and int(length) > limit:
+        raise ValueError(f"{int(length)} bytes exceeds the {limit} byte limit")
+    h = hashlib.sha256()
+    size = 0
+    # A trickling server can keep each read under the timeout, so a timer cuts the connection at the deadline
+    watchdog = None
+    if deadline is not None:
+        watchdog = threading.Timer(max(0, deadline - time.monotonic()), abort_response, (r,))
+        watchdog.daemon = True
+        watchdog.start()
+    try:
+        for chunk in r.iter_content(CHUNK_SIZE):
+            size += len(chunk)
+            if size > limit:
+                raise ValueError(f"body exceeds the {limit} byte limit")
+            h.update(chunk)
+            f.write(chunk)
+            stats['bytes'] = size
+    except Exception:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"build deadline reached after {size} bytes")
+        raise
+    finally:
+        if watchdog: watchdog.cancel()
+    stats['transfer_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return h.hexdigest(), size
+
+def retry_delay(error, attempt, ctx):
+    """Seconds to wait before retrying after error (full-jitter backoff, Retry-After honoured), or None to give up."""
+    if attempt >= ctx.retries:
+        return None
+    response = getattr(error, 'response', None)
+    if isinstance(error, requests.HTTPError):
+        if response is None or response.status_code not in RETRY_STATUS:
+            return None
+    elif not isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return None
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+    if retry_after.isdigit():
+        delay = max(delay, min(BACKOFF_MAX, int(retry_after)))
+    if ctx.deadline is not None and time.monotonic() + delay >= ctx.deadline:
+        return None
+    return delay
+
+def download(url, read_timeout, ctx):
+    """Downloads a source, retrying transient failures with backoff until ctx.retries or the deadline runs out."""
+    stats = ctx.report.source(url)
+    attempt = 0
+    while True:
+        try:
+            return download_once(url, ctx.timeout(read_timeout), ctx)
+        except Exception as e:
+            delay = retry_delay(e, attempt, ctx)
+            if delay is None:
+                raise
+            attempt += 1
+            stats['retries'] = attempt
+            logging.warning(f"    [~] {url}: {e}; retry {attempt}/{ctx.retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+def download_once(url, timeout, ctx):
+    """Streams a source to disk; returns (open body file or None after a 304, sha256, encoding)."""
+    stats = ctx.report.source(url)
+    if ctx.cache is None:
+        body = tempfile.TemporaryFile()
+        try:
+            with timed_get(url, timeout, stats, session=ctx.session) as r:
+                r.raise_for_status()
+                digest, _ = stream_to(r, body, ctx.max_archive_bytes, stats, ctx.deadline)
+                encoding = r.encoding
+        except Exception:
+            body.close()
+            raise
+        body.seek(0)
+        return body, digest, encoding
+
+    body, meta, not_modified = ctx.cache.get(url, timeout, ctx.max_archive_bytes, stats, ctx.session, ctx.deadline)
+    return body, meta['sha256'], meta.get('encoding')
+
+def read_member(z, info, limit):
+    """Decompresses one archive member, or returns None if it is (or inflates to) more than limit bytes."""
+    if info.file_size > limit:
+        return None
+    with z.open(info) as f:
+        data = f.read(limit + 1)
+    return data if len(data) <= limit else None
+
+def store_blob(ctx, fields, data):
+    """Publishes a plugin file under its content hash (no-op without a blob dir or if already there)."""
+    if not ctx.blob_dir: return
+    path = os.path.join(ctx.blob_dir, os.path.basename(fields['blob_url']))
+    if os.path.exists(path): return
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def prune_blobs(blob_dir, plugins):
+    """Removes blobs that none of records (every source's, not just the deduplicated registry) points at."""
+    keep = {os.path.basename(p['blob_url']) for p in plugins if p.get('blob_url')}
+    removed = 0
+    for name in (os.listdir(blob_dir) if os.path.isdir(blob_dir) else []):
+        if name not in keep:
+            os.remove(os.path.join(blob_dir, name))
+            removed += 1
+    if removed:
+        logging.info(f"[*] Blobs: removed {removed} no longer referenced")
+
+def carried_forward(url, digest, ctx):
+    """The previous records for an unchanged source, re-recorded; None if it must be reprocessed (e.g. blobs missing)."""
+    if ctx.manifest is None: return None
+    previous = ctx.manifest.lookup(url, digest)
+    if previous is not None and ctx.blob_dir:
+        if not all(p.get('blob_url') and os.path.exists(os.path.join(ctx.blob_dir, os.path.basename(p['blob_url'])))
+                   for p in previous):
+            return None
+    if previous is not None:
+        logging.info(f"    [=] Unchanged, carrying forward {len(previous)} plugins from {url}")
+        ctx.manifest.record(url, digest, previous)
+        stats = ctx.report.source(url)
+        stats['unchanged'] = True
+        stats['accepted'] = len(previous)
+    return previous
+
+def process_zip_url(url, ctx=None):
+    ctx = ctx or BuildContext()
+    stats = ctx.report.source(url)
     found = []
     try:
         logging.info(f"[*] Downloading ZIP: {url}...")
-        r = requests.get(url, timeout=30)
-        r.raise_for_status()
-        
-        z = zipfile.ZipFile(io.BytesIO(r.content))
+        body, digest, _ = download(url, ZIP_READ_TIMEOUT, ctx)
+        previous = carried_forward(url, digest, ctx)
+        if previous is not None:
+            if body: body.close()
+            return previous
+        body = body or ctx.cache.open(url)
+        body.seek(0, os.SEEK_END)
+        archive_size = body.tell()
+        body.seek(0)
         
-        for filename in z.namelist():
-            if filename.endswith(".py") and "__init__" not in filename and "/." not in filename:
-                with z.open(filename) as f:
-                    code = f.read().decode('utf-8', errors='ignore')
+        candidates = []
+        files = []
+        contents = []
+        with body, zipfile.ZipFile(body) as z:
+            for filename in z.namelist():
+                # Only .py members are decompressed; images, firmware etc. never leave the archive
+                if not (filename.endswith(".py") and "__init__" not in filename and "/." not in filename):
+                    continue
+                stats['members_scanned'] += 1
+                data = read_member(z, z.getinfo(filename), ctx.max_member_bytes)
+                if data is None:
+                    stats['members_oversize'] += 1
+                    logging.warning(f"    [-] Skipping {filename}: larger than {ctx.max_member_bytes} bytes")
+                    continue
+                code = data.decode('utf-8', errors='ignore')
                 
                 # Assume any .py file that passes the filename filter is a plugin (lowering the strictness barrier)
-                plugin = parse_python_content(code, filename.split("/")[-1], url, filename)
-                if plugin:
-                    logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
-                    found.append(plugin)
+                candidates.append((code, filename.split("/")[-1], url, filename))
+                files.append(file_fields(data, digest, archive_size))
+                contents.append(data)
+
+        for plugin, fields, data in zip(ctx.parse(candidates, stats), files, contents):
+            if plugin:
+                plugin.update(fields)
+                store_blob(ctx, fields, data)
+                logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
+                found.append(plugin)
+
+        if ctx.manifest: ctx.manifest.record(url, digest, found)
                 
     except Exception as e:
+        stats['error'] = str(e)
         logging.error(f"    [!] ZIP Error for {url}: {e}")
     return found
 
-def main():
-    print("--- PwnStore Builder v1.2 Starting ---")
+def process_raw_url(url, ctx=None):
+    ctx = ctx or BuildContext()
+    stats = ctx.report.source(url)
+    found = []
+    try:
+        # Handle single raw file URL
+        body, digest, encoding = download(url, RAW_READ_TIMEOUT, ctx)
+        previous = carried_forward(url, digest, ctx)
+        if previous is not None:
+            if body: body.close()
+            return previous
+        with body or ctx.cache.open(url) as f:
+            data = f.read()
+        code = data.decode(encoding or 'utf-8', errors='replace')
+        stats['members_scanned'] = 1
+        plugin = ctx.parse([(code, url.split("/")[-1], url, None)], stats)[0]
+        if plugin:
+            fields = file_fields(data)
+            plugin.update(fields)
+            store_blob(ctx, fields, data)
+            logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
+            found.append(plugin)
+        if ctx.manifest: ctx.manifest.record(url, digest, found)
+    except Exception as e:
+        stats['error'] = str(e)
+        logging.error(f"    [!] Raw File Error for {url}: {e}")
+    return found
+
+def fetch_source(url, host_slots, ctx):
+    """Fetches and parses one repos.txt entry, falling back to the previous build's records if it fails."""
+    stats = ctx.report.source(url)
+    with host_slots[urlparse(url).netloc]:
+        stats['start'] = ctx.report.now()
+        try:
+            if url.endswith(".zip"):
+                found = process_zip_url(url, ctx)
+            else:
+                found = process_raw_url(url, ctx)
+        finally:
+            stats['end'] = ctx.report.now()
+    if stats['error'] and ctx.manifest:
+        # Keep serving what the last build found rather than dropping the source
+        previous = ctx.manifest.fallback(url)
+        if previous is not None:
+            logging.warning(f"    [~] Keeping {len(previous)} plugins from the previous build of {url}")
+            stats['fallback'] = True
+            stats['accepted'] = len(previous)
+            return previous
+    return found
+
+def fetch_each(urls, ctx, workers=MAX_WORKERS, per_host=PER_HOST_LIMIT):
+    """Fetches every source concurrently and returns one list of plugins per url, in input order."""
+    host_slots = {urlparse(url).netloc: threading.BoundedSemaphore(per_host) for url in urls}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(lambda url: fetch_source(url, host_slots, ctx), urls))
+
+def fetch_all(urls, ctx, workers=MAX_WORKERS, per_host=PER_HOST_LIMIT):
+    """Fetches every source concurrently and returns their plugins in repos.txt order, whatever the completion order."""
     master_list = []
-    
+    for plugins in fetch_each(urls, ctx, workers, per_host):
+        master_list.extend(plugins)
+    return master_list
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / 1048576 if sys.platform == "darwin" else peak / 1024
+
+def write_bytes(path, data):
+    """Writes data to path, leaving the file alone if its content is unchanged."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data: return
+    except OSError:
+        pass
+    with open(path, "wb") as f:
+        f.write(data)
+
+def write_json(path, data):
+    """Writes compact JSON, leaving the file alone if its content is unchanged."""
+    write_bytes(path, json.dumps(data, separators=(",", ":")).encode())
+
+def read_json(path, default=None):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def write_delta(previous, plugins, folder):
+    """Bumps the revision if the registry changed, writing deltas/<revision>.json; returns the revision."""
+    manifest = read_json(os.path.join(folder, ARTIFACT_MANIFEST), {})
+    revision = manifest.get('revision', 0)
+    if previous == plugins:
+        return revision
+
+    revision += 1
+    delta_dir = os.path.join(folder, DELTA_DIR)
+    os.makedirs(delta_dir, exist_ok=True)
+    if previous is not None:
+        before = {p['name']: p for p in previous}
+        after = {p['name']: p for p in plugins}
+        write_json(os.path.join(delta_dir, f"{revision}.json"), {
+            'revision': revision,
+            'base': revision - 1,
+            'added': [p for name, p in after.items() if name not in before],
+            'changed': [p for name, p in after.items() if name in before and before[name] != p],
+            'removed': sorted(name for name in before if name not in after),
+        })
+
+    for name in os.listdir(delta_dir):
+        number = name[:-len(".json")]
+        if number.isdigit() and not revision - DELTA_KEEP < int(number) <= revision:
+            os.remove(os.path.join(delta_dir, name))
+    return revision
+
+def oldest_delta(folder, revision):
+    """Lowest revision reachable from its predecessor by an unbroken chain of patches."""
+    oldest = revision + 1
+    while oldest > 1 and os.path.exists(os.path.join(folder, DELTA_DIR, f"{oldest - 1}.json")):
+        oldest -= 1
+    return oldest
+
+def write_artifacts(plugins, folder, revision=0):
+    """Writes the minified registry, its compressed copies and the manifest listing each variant's size and sha256."""
+    minified = json.dumps(plugins, separators=(",", ":")).encode()
+    variants = {MIN_OUTPUT_FILE: minified, MIN_OUTPUT_FILE + ".gz": gzip.compress(minified, 9, mtime=0)}
+    if zstandard:
+        variants[MIN_OUTPUT_FILE + ".zst"] = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(minified)
+    for name, data in variants.items():
+        write_bytes(os.path.join(folder, name), data)
+
+    with open(os.path.join(folder, OUTPUT_FILE), "rb") as f:
+        variants[OUTPUT_FILE] = f.read()
+    artifacts = {name: {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+                 for name, data in sorted(variants.items())}
+    manifest = {'revision': revision, 'oldest_delta': oldest_delta(folder, revision), 'artifacts': artifacts}
+    write_bytes(os.path.join(folder, ARTIFACT_MANIFEST), json.dumps(manifest, indent=2).encode())
+
+def search_grams(token):
+    """Trigrams of a token, anchored at its start so prefixes score higher than inner matches."""
+    padded = "_" + token
+    return {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+
+def build_search_index(plugins):
+    """Inverted index over name, author and description, plus a trigram map of the indexed words."""
+    docs, tokens = [], {}
+    for doc, plugin in enumerate(plugins):
+        docs.append([plugin[key] for key in SEARCH_DOC_FIELDS])
+        for field, (key, _) in enumerate(SEARCH_FIELDS):
+            for word in set(SEARCH_TOKEN.findall(str(plugin.get(key, "")).lower())):
+                tokens.setdefault(word, [[], [], []])[field].append(doc)
+
+    trigrams = {}
+    for word in sorted(tokens):
+        for gram in search_grams(word):
+            trigrams.setdefault(gram, []).append(word)
+    return {
+        'doc_fields': list(SEARCH_DOC_FIELDS),
+        'fields': [key for key, _ in SEARCH_FIELDS],
+        'weights': [weight for _, weight in SEARCH_FIELDS],
+        'docs': docs,
+        'tokens': tokens,
+        'trigrams': trigrams,
+    }
+
+def write_shards(plugins, root):
+    """Writes index.json, plugins/, categories/ and the search index under root, removing stale shards."""
+    categories = {}
+    for plugin in plugins:
+        categories.setdefault(plugin['category'], []).append(plugin)
+
+    wanted = {"plugins": {}, "categories": {}}
+    for plugin in plugins:
+        if SHARD_NAME.match(plugin['name']):
+            wanted["plugins"][plugin['name'] + ".json"] = plugin
+    for category, members in categories.items():
+        if SHARD_NAME.match(category):
+            wanted["categories"][category + ".json"] = members
+
+    for sub, files in wanted.items():
+        folder = os.path.join(root, sub)
+        os.makedirs(folder, exist_ok=True)
+        for name in os.listdir(folder):
+            if name not in files:
+                os.remove(os.path.join(folder, name))
+        for name, data in files.items():
+            write_json(os.path.join(folder, name), data)
+
+    write_json(os.path.join(root, "index.json"), [{k: p[k] for k in INDEX_FIELDS} for p in plugins])
+    # Sorted keys: word and trigram sets iterate in a per-process order, and the bytes should not
+    search = json.dumps(build_search_index(plugins), separators=(",", ":"), sort_keys=True).encode()
+    write_bytes(os.path.join(root, "search.json"), search)
+    write_bytes(os.path.join(root, "search.json.gz"), gzip.compress(search, 9, mtime=0))
+
+def read_sources():
+    """repos.txt entries in order, or None if the file is missing."""
     if not os.path.exists(INPUT_FILE):
         logging.error(f"Error: {INPUT_FILE} not found.")
-        return
-
+        return None
     with open(INPUT_FILE, "r") as f:
-        urls = [line.strip() for line in f.readlines() if line.strip() and not line.startswith("#")]
+        return [line.strip() for line in f.readlines() if line.strip() and not line.startswith("#")]
 
-    for url in urls:
-        if url.endswith(".zip"):
-            plugins = process_zip_url(url)
-            master_list.extend(plugins)
-        else:
-            try:
-                # Handle single raw file URL
-                code = requests.get(url, timeout=15).text
-                plugin = parse_python_content(code, url.split("/")[-1], url, None)
-                if plugin:
-                    logging.info(f"    [+] {plugin['name']:<25} -> {plugin['category']}")
-                    master_list.append(plugin)
-            except Exception as e: 
-                logging.error(f"    [!] Raw File Error for {url}: {e}")
-
-    # --- DEDUPLICATION AND SORT ---
+def shard_spec(value):
+    """argparse type for --shard: 'i/n' with 1 <= i <= n."""
+    match = re.fullmatch(r"(\d+)/(\d+)", value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"expected i/n with 1 <= i <= n, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+def sources_digest(urls):
+    """Fingerprint of the source list, so partials from different repos.txt revisions aren't merged."""
+    return hashlib.sha256("\n".join(urls).encode()).hexdigest()[:16]
+
+def shard_sources(urls, index, count):
+    """The (position, url) pairs shard index of count builds, dealt round-robin; duplicate urls only once."""
+    unique = list(dict.fromkeys(urls))
+    return [(position, url) for position, url in enumerate(unique) if position % count == index - 1]
+
+def partial_path(folder, index, count):
+    return os.path.join(folder, f"shard-{index}-of-{count}.json")
+
+def save_partial(path, shard, urls, selected, results, ctx, report):
+    """Writes a shard's per-source records, manifest entries and report stats for merge."""
+    sources = []
+    for (position, url), plugins in zip(selected, results):
+        sources.append({
+            'position': position, 'url': url, 'manifest': ctx.manifest.sources.get(url),
+            'plugins': plugins, 'stats': report.source(url),
+        })
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    write_json(path, {
+        'parser': parser_version(), 'sources_digest': sources_digest(list(dict.fromkeys(urls))),
+        'shard': list(shard), 'duration': report.now(), 'peak_rss_mb': round(peak_rss_mb(), 1),
+        'sources': sources,
+    })
+
+def load_partials(folder, urls):
+    """Reads every partial in folder; returns them if they are one complete, matching set, else None."""
+    names = sorted(name for name in os.listdir(folder) if re.fullmatch(r"shard-\d+-of-\d+\.json", name)) if os.path.isdir(folder) else []
+    partials = [read_json(os.path.join(folder, name)) for name in names]
+    if not partials or None in partials:
+        logging.error(f"[!] No readable partials in {folder}")
+        return None
+    counts = {p['shard'][1] for p in partials}
+    if len(counts) != 1:
+        logging.error(f"[!] Partials from different shard counts: {sorted(counts)}")
+        return None
+    count = counts.pop()
+    missing = set(range(1, count + 1)) - {p['shard'][0] for p in partials}
+    if missing:
+        logging.error(f"[!] Missing shards {sorted(missing)} of {count}")
+        return None
+    digest = sources_digest(list(dict.fromkeys(urls)))
+    for p in partials:
+        if p['sources_digest'] != digest:
+            logging.error(f"[!] Shard {p['shard'][0]}/{count} was built from a different {INPUT_FILE}")
+            return None
+        if p['parser'] != parser_version():
+            logging.error(f"[!] Shard {p['shard'][0]}/{count} was built by a different parser version")
+            return None
+    return partials
+
+def dedupe(master_list):
+    """One record per plugin name (case-insensitive), highest version first seen wins, sorted by name."""
     final_plugins = {}
     for plugin in master_list:
         name_key = plugin['name'].lower()
@@ -141,12 +1239,132 @@ def main():
             final_plugins[name_key] = plugin
             
     # Sort the final list alphabetically by name
-    sorted_plugins = sorted(final_plugins.values(), key=lambda p: p['name'].lower())
+    return sorted(final_plugins.values(), key=lambda p: p['name'].lower())
+
+def publish(master_list, manifest, urls, report, blob_dir, **totals):
+    """Dedupes master_list and writes plugins.json with its shards, variants, delta and the report."""
+    start = report.now()
+    sorted_plugins = dedupe(master_list)
+
+    output_dir = os.path.dirname(OUTPUT_FILE) or "."
+    prune_blobs(blob_dir, [p for entry in manifest.sources.values() for p in entry['plugins']])
+    revision = write_delta(read_json(OUTPUT_FILE), sorted_plugins, output_dir)
 
     with open(OUTPUT_FILE, "w") as f:
         json.dump(sorted_plugins, f, indent=2)
+    write_shards(sorted_plugins, os.path.join(output_dir, REGISTRY_DIR))
+    write_artifacts(sorted_plugins, output_dir, revision)
+    report.phase("dedupe_and_write", start)
+
+    report_path = os.path.join(os.path.dirname(OUTPUT_FILE), REPORT_FILE)
+    report.save(report_path, urls, plugins=len(sorted_plugins), peak_rss_mb=round(peak_rss_mb(), 1), **totals)
     
     print(f"\n[SUCCESS] Generated sorted registry with {len(sorted_plugins)} unique plugins.")
+    print(f"[*] Peak RSS: {peak_rss_mb():.1f} MB")
+    print(f"[*] Build report: {report_path}")
+
+def merge(args):
+    """Combines the partials of a sharded build into the same outputs a single build writes."""
+    print("--- PwnStore Builder v1.2 Merging ---")
+    urls = read_sources()
+    if urls is None:
+        sys.exit(1)
+    report = BuildReport()
+    start = report.now()
+    partials = load_partials(args.partials, urls)
+    if partials is None:
+        sys.exit(1)
+
+    # Sources back in repos.txt order, so dedupe sees the sequence a single build would
+    sources = sorted((s for p in partials for s in p['sources']), key=lambda s: s['position'])
+    master_list = [plugin for source in sources for plugin in source['plugins']]
+
+    # Nothing is written until every blob the shards produced is here
+    blob_dir = os.path.join(os.path.dirname(OUTPUT_FILE), BLOB_DIR)
+    if not os.path.isdir(blob_dir):
+        logging.error(f"[!] No {blob_dir}/ directory; copy each shard's {BLOB_DIR}/ here before merging")
+        sys.exit(1)
+    missing = sum(1 for p in master_list if not os.path.exists(os.path.join(blob_dir, os.path.basename(p['blob_url']))))
+    if missing:
+        logging.error(f"[!] {missing} plugins have no blob in {blob_dir}; copy each shard's {BLOB_DIR}/ here before merging")
+        sys.exit(1)
+
+    manifest = BuildManifest(MANIFEST_FILE, full=True)
+    for source in sources:
+        report.sources[source['url']] = source['stats']
+        entry = source['manifest']
+        if entry:
+            manifest.record(source['url'], entry['sha256'], entry['plugins'], entry.get('failures', 0))
+    manifest.save()
+    report.phase("merge", start)
+    print(f"[*] Merged {len(partials)} shards, {len(sources)} sources")
+    publish(master_list, manifest, urls, report, blob_dir, shards=len(partials),
+            shard_seconds=max(p['duration'] for p in partials))
+
+def main():
+    parser = argparse.ArgumentParser(description="PwnStore registry builder")
+    parser.add_argument('command', nargs='?', choices=['build', 'merge'], default='build', help='build (default), or merge the partials of a sharded build')
+    parser.add_argument('--shard', type=shard_spec, metavar='I/N', help='Build only the I-th of N slices of repos.txt into a partial for merge')
+    parser.add_argument('--partials', default=PARTIAL_DIR, help='Where --shard writes and merge reads partials (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Concurrent downloads (default: %(default)s)')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_LIMIT, help='Concurrent downloads per host (default: %(default)s)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Download cache directory (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='Always download sources in full and reparse every file')
+    parser.add_argument('--full', action='store_true', help='Ignore the build manifest and reparse every source')
+    parser.add_argument('--max-archive-mb', type=int, default=MAX_ARCHIVE_BYTES // 1048576, help='Skip sources larger than this (default: %(default)s)')
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS, help='Processes used to parse large archives (default: %(default)s)')
+    parser.add_argument('--deadline', type=int, default=BUILD_DEADLINE, help='Seconds for all downloads, 0 for no limit (default: %(default)s)')
+    parser.add_argument('--retries', type=int, default=MAX_RETRIES, help='Retries per source for transient errors (default: %(default)s)')
+    parser.add_argument('--max-member-kb', type=int, default=MAX_MEMBER_BYTES // 1024, help='Skip .py members larger than this (default: %(default)s)')
+    args = parser.parse_args()
+    if args.command == 'merge':
+        return merge(args)
+
+    print("--- PwnStore Builder v1.2 Starting ---")
+    
+    urls = read_sources()
+    if urls is None:
+        return
+    selected = shard_sources(urls, *args.shard) if args.shard else None
+
+    report = BuildReport()
+    start = report.now()
+    ctx = BuildContext(
+        cache=None if args.no_cache else ArchiveCache(args.cache_dir),
+        manifest=BuildManifest(MANIFEST_FILE, full=args.full),
+        max_archive_bytes=args.max_archive_mb * 1048576,
+        max_member_bytes=args.max_member_kb * 1024,
+        parse_workers=args.parse_workers,
+        parse_cache=None if args.no_cache else ParseCache(PARSE_CACHE_FILE),
+        report=report,
+        blob_dir=os.path.join(os.path.dirname(OUTPUT_FILE), BLOB_DIR),
+        deadline=args.deadline or None,
+        retries=args.retries,
+        pool_size=args.per_host,
+    )
+    report.phase("setup", start)
+    start = report.now()
+    try:
+        if selected is not None:
+            results = fetch_each([url for _, url in selected], ctx, workers=args.workers, per_host=args.per_host)
+        else:
+            master_list = fetch_all(urls, ctx, workers=args.workers, per_host=args.per_host)
+    finally:
+        ctx.close()
+    report.phase("fetch_and_parse", start)
+    start = report.now()
+    if ctx.cache: ctx.cache.evict()
+    if selected is not None:
+        # The manifest and outputs are written by merge, once every shard is done
+        path = partial_path(args.partials, *args.shard)
+        save_partial(path, args.shard, urls, selected, results, ctx, report)
+        print(f"\n[SUCCESS] Shard {args.shard[0]}/{args.shard[1]}: {sum(map(len, results))} plugins from {len(selected)} sources.")
+        print(f"[*] Peak RSS: {peak_rss_mb():.1f} MB")
+        print(f"[*] Partial: {path}")
+        return
+    ctx.manifest.save()
+    report.phase("cache_and_manifest", start)
+    publish(master_list, ctx.manifest, urls, report, ctx.blob_dir)
 
 if __name__ == "__main__":
     main()
@@ -11,9 +11,25 @@ import argparse
 import os
 import sys
 import zipfile
-import io
-import shutil
 import re
+import shutil
+import gzip
+import hashlib
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+
+# Optional: lets the registry download use the smaller .zst variant
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 
 # --- CONFIGURATION ---
 DEFAULT_REGISTRY = "https://raw.githubusercontent.com/wpa-2/pwnagotchi-store/main/plugins.json"
@@ -21,6 +37,32 @@ DEFAULT_REGISTRY = "https://raw.githubusercontent.com/wpa-2/pwnagotchi-store/mai
 CUSTOM_PLUGIN_DIR = "/usr/local/share/pwnagotchi/custom-plugins/"
 CONFIG_FILE = "/etc/pwnagotchi/config.toml"
 
+# Local copy of the registry, brought up to date with patches from deltas/
+REGISTRY_CACHE_DIR = "/var/cache/pwnstore"
+# Commands run without sudo cache here, and still read what root cached
+USER_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "pwnstore")
+MAX_DELTA_CHAIN = 10   # Further behind than this, a full download is cheaper
+
+# Registry files cached on the device are reused without a request for REGISTRY_TTL seconds,
+# then revalidated with their ETag (read commands take --ttl / --offline; installs always revalidate)
+REGISTRY_TTL = 6 * 3600
+OFFLINE = False
+
+# Installing one file out of a repo zip with HTTP Range requests
+RANGE_TAIL_BYTES = 64 * 1024   # First request: end of central directory, usually with the directory itself
+LOCAL_HEADER_SLACK = 1024      # Room for a local header's extra field, which may differ from the central one
+
+# Batch downloads (install a b c, update)
+DOWNLOAD_JOBS = 4              # Archives/files fetched at once; installs themselves stay one at a time
+DOWNLOAD_CHUNK = 64 * 1024
+RESUME_ATTEMPTS = 3            # Range resumes after a dropped connection before a download fails
+# Whole repo archives are kept in REGISTRY_CACHE_DIR/archives for the next install from the same repo
+ARCHIVE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Ranked search over registry/search.json
+SEARCH_MIN_SIMILARITY = 0.5   # Share of a query word's trigrams a field must contain to match
+EXACT_WORD_BONUS = 1.5        # Whole-word hits rank above partial/fuzzy ones
+
 # ANSI Colors
 GREEN = "\033[92m"
 YELLOW = "\033[93m"
@@ -88,6 +130,388 @@ def get_local_version(file_path):
         pass
     return "0.0.0"
 
+def file_sha256(path):
+    """sha256 of a local file, or None if it can't be read."""
+    try:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                h.update(chunk)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+def format_size(size):
+    if size is None: return "unknown size"
+    if size < 1024: return f"{size} B"
+    if size < 1024 * 1024: return f"{size / 1024:.1f} KB"
+    return f"{size / 1048576:.1f} MB"
+
+def download_size(plugin_data):
+    """Bytes install will fetch: the standalone blob if published, else the whole repo archive for zip plugins."""
+    if plugin_data.get('origin_type') == 'zip' and not plugin_data.get('blob_url'):
+        return plugin_data.get('archive_size')
+    return plugin_data.get('size')
+
+class RangeUnsupported(Exception):
+    """The server answered a Range request with an error, or with the full body (.response, left open for the caller to save or close)."""
+    def __init__(self, response=None):
+        super().__init__("range requests not supported")
+        self.response = response
+
+class Downloader:
+    """One HTTP session shared by a batch's download workers, plus their combined progress line (drawn on a tty only)."""
+    def __init__(self, jobs=1, total=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=max(1, jobs))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.total = total
+        self.done = 0
+        self.start = time.monotonic()
+        self.lock = threading.Lock()
+        self.live = sys.stdout.isatty()
+
+    def open(self, url, headers=None):
+        """Streaming GET, asking for an uncompressed body so Content-Length holds and ranges can resume."""
+        return self.session.get(url, headers=dict({'Accept-Encoding': 'identity'}, **(headers or {})), timeout=30, stream=True)
+
+    def advance(self, nbytes):
+        with self.lock:
+            self.done += nbytes
+            if self.live: self.draw()
+
+    def get(self, url, headers=None):
+        """GET a small body into memory, counting it towards the progress line; returns (response, body)."""
+        chunks = []
+        with self.open(url, headers) as r:
+            for chunk in r.iter_content(DOWNLOAD_CHUNK):
+                chunks.append(chunk)
+                self.advance(len(chunk))
+        return r, b"".join(chunks)
+
+    def save(self, url, path, response=None):
+        """Streams url into path, resuming a dropped connection with Range/If-Range; response is an already opened reply."""
+        have, total, validator, headers = 0, None, None, None
+        with open(path, "wb") as f:
+            for attempt in range(RESUME_ATTEMPTS + 1):
+                try:
+                    r = response or self.open(url, headers)
+                    response = None
+                    with r:
+                        start = r.headers.get('Content-Range', '').partition(' ')[2].partition('-')[0]
+                        if not (have and r.status_code == 206 and start == str(have)):
+                            r.raise_for_status()
+                            if have:
+                                self.advance(-have)
+                                f.seek(0)
+                                f.truncate()
+                                have = 0
+                            length = r.headers.get('Content-Length', '')
+                            # A compressed body's length doesn't match the bytes iter_content yields
+                            total = int(length) if length.isdigit() and r.headers.get('Content-Encoding', 'identity') == 'identity' else None
+                            validator = r.headers.get('ETag') or r.headers.get('Last-Modified')
+                        for chunk in r.iter_content(DOWNLOAD_CHUNK):
+                            f.write(chunk)
+                            have += len(chunk)
+                            self.advance(len(chunk))
+                    if total is None or have >= total: return
+                    error = IOError(f"connection closed after {have} of {total} bytes")
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+                    error = e
+                if total is not None and validator:
+                    headers = {'Range': f"bytes={have}-", 'If-Range': validator}
+                    self.log(f"{YELLOW}[!] Download interrupted at {format_size(have)} of {format_size(total)}, resuming...{RESET}")
+                else:
+                    self.log(f"{YELLOW}[!] Download interrupted, starting over...{RESET}")
+        raise error
+
+    def status(self):
+        elapsed = max(time.monotonic() - self.start, 1e-3)
+        rate = self.done / elapsed
+        line = f"[*] {format_size(self.done)}"
+        if self.total and self.done < self.total:
+            line += f" of {format_size(self.total)}"
+        line += f" at {format_size(rate)}/s"
+        if self.total and self.done < self.total and rate > 0:
+            line += f", ETA {format_age((self.total - self.done) / rate)}"
+        return line
+
+    def draw(self):
+        sys.stdout.write(f"\r\033[K{self.status()}")
+        sys.stdout.flush()
+
+    def log(self, message):
+        """Prints a message above the progress line."""
+        with self.lock:
+            if self.live: sys.stdout.write("\r\033[K")
+            print(message)
+            if self.live and self.done: self.draw()
+
+    def close(self):
+        self.session.close()
+        if self.live: sys.stdout.write("\r\033[K")
+        if self.done:
+            elapsed = max(time.monotonic() - self.start, 1e-3)
+            print(f"[*] Downloaded {format_size(self.done)} in {elapsed:.1f}s ({format_size(self.done / elapsed)}/s)")
+
+def fetch_range(url, spec, downloader):
+    """GET one byte range ("bytes=..."); returns (data, total archive size or None)."""
+    r = downloader.open(url, {'Range': spec})
+    if r.status_code == 200:
+        raise RangeUnsupported(r)
+    with r:
+        if r.status_code != 206:
+            raise RangeUnsupported()
+        body = b""
+        for chunk in r.iter_content(DOWNLOAD_CHUNK):
+            body += chunk
+            downloader.advance(len(chunk))
+    total = r.headers.get('Content-Range', '').rpartition('/')[2]
+    return body, int(total) if total.isdigit() else None
+
+def zip64_extra(extra, values):
+    """Replaces 0xFFFFFFFF placeholders in values with their ZIP64 extra field (0x0001) counterparts, in order."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, size = struct.unpack('<HH', extra[pos:pos + 4])
+        if tag == 1:
+            fields = extra[pos + 4:pos + 4 + size]
+            out, offset = [], 0
+            for v in values:
+                if v == 0xFFFFFFFF and offset + 8 <= len(fields):
+                    v = struct.unpack('<Q', fields[offset:offset + 8])[0]
+                    offset += 8
+                out.append(v)
+            return out
+        pos += 4 + size
+    return values
+
+def fetch_zip_member_ranged(url, member, downloader):
+    """One member of a remote zip, read with Range requests; None if it can't be read this way."""
+    tail, total = fetch_range(url, f"bytes=-{RANGE_TAIL_BYTES}", downloader)
+    if total is None: return None
+    tail_start = total - len(tail)
+
+    def read(start, length):
+        if start >= tail_start:
+            return tail[start - tail_start:start - tail_start + length]
+        return fetch_range(url, f"bytes={start}-{start + length - 1}", downloader)[0]
+
+    eocd = tail.rfind(b'PK\x05\x06')
+    if eocd < 0 or eocd + 22 > len(tail): return None
+    _, _, _, _, entries, cd_size, cd_offset, _ = struct.unpack('<4s4H2IH', tail[eocd:eocd + 22])
+    concat = tail_start + eocd - cd_size - cd_offset   # Bytes prepended to the archive, like zipfile tolerates
+    if cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF or entries == 0xFFFF:
+        locator = tail[eocd - 20:eocd]
+        if eocd < 20 or locator[:4] != b'PK\x06\x07': return None
+        record = read(struct.unpack('<4sIQI', locator)[2], 56)
+        if record[:4] != b'PK\x06\x06': return None
+        cd_size, cd_offset = struct.unpack('<QQ', record[40:56])
+        concat = 0
+
+    directory = read(cd_offset + concat, cd_size)
+    pos = 0
+    while pos + 46 <= len(directory) and directory[pos:pos + 4] == b'PK\x01\x02':
+        (_, _, _, flags, method, _, _, crc, comp_size, size, name_len, extra_len, comment_len,
+         _, _, _, offset) = struct.unpack('<4s6H3I5H2I', directory[pos:pos + 46])
+        name = directory[pos + 46:pos + 46 + name_len].decode('utf-8' if flags & 0x800 else 'cp437')
+        if name == member:
+            extra = directory[pos + 46 + name_len:pos + 46 + name_len + extra_len]
+            size, comp_size, offset = zip64_extra(extra, [size, comp_size, offset])
+            if flags & 0x1 or method not in (0, 8): return None
+            start = offset + concat
+            chunk = read(start, 30 + name_len + comp_size + LOCAL_HEADER_SLACK)
+            if chunk[:4] != b'PK\x03\x04': return None
+            local_name_len, local_extra_len = struct.unpack('<HH', chunk[26:30])
+            data_start = 30 + local_name_len + local_extra_len
+            data = chunk[data_start:data_start + comp_size]
+            if len(data) < comp_size:
+                data += read(start + data_start + len(data), comp_size - len(data))
+            if method == 8:
+                data = zlib.decompressobj(-15).decompress(data)
+            if len(data) != size or zlib.crc32(data) != crc: return None
+            return data
+        pos += 46 + name_len + extra_len + comment_len
+    return None
+
+def staging_file(name):
+    """A new empty file in the plugin directory, for a download that os.replace later moves into place."""
+    os.makedirs(CUSTOM_PLUGIN_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=CUSTOM_PLUGIN_DIR, prefix=f".{name}.", suffix=".tmp")
+    os.close(fd)
+    os.chmod(path, 0o644)
+    return path
+
+def extract_member(archive, member, path):
+    """Copies one member of a zip on disk to path in chunks; zipfile checks its CRC on the way."""
+    with zipfile.ZipFile(archive) as z, z.open(member) as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK)
+
+class ArchiveCache:
+    """Repo archives kept on the device by sha256, with per-URL validators; least recently used evicted past max_bytes."""
+
+    def __init__(self, root, max_bytes=ARCHIVE_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _archive(self, sha256):
+        return os.path.join(self.root, f"{sha256}.zip")
+
+    def _meta_path(self, url):
+        return os.path.join(self.root, hashlib.sha256(url.encode()).hexdigest()[:32] + ".json")
+
+    def _read_meta(self, url):
+        return self._load(self._meta_path(url))
+
+    def _load(self, meta_path):
+        try:
+            with open(meta_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, url, meta):
+        path = self._meta_path(url)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _use(self, sha256):
+        """Path of the cached archive with this hash, marked as just used; None if it isn't cached."""
+        path = self._archive(sha256)
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            return None
+
+    def has(self, url, sha256=None):
+        """Whether an archive for url is cached: the one with the registry's hash, or the last one url served."""
+        if sha256 and os.path.exists(self._archive(sha256)): return True
+        meta = self._read_meta(url)
+        return bool(meta) and os.path.exists(self._archive(meta['sha256']))
+
+    def get(self, url, downloader, sha256=None, size=None, response=None):
+        """Path of url's archive in the cache, fetched or revalidated as needed; response is an opened full reply to store."""
+        if response is None:
+            path = self._use(sha256) if sha256 else None
+            if path:
+                downloader.log(f"[*] Using cached repository archive ({format_size(size)})...")
+                return path
+            meta = self._read_meta(url)
+            headers = {}
+            if meta and os.path.exists(self._archive(meta['sha256'])):
+                if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'): headers['If-Modified-Since'] = meta['last_modified']
+            response = downloader.open(url, headers)
+            if response.status_code == 304 and headers:
+                response.close()
+                path = self._use(meta['sha256'])
+                if path:
+                    downloader.log(f"[*] Using cached repository archive, unchanged upstream ({format_size(size)})...")
+                    return path
+                response = downloader.open(url)
+        downloader.log(f"[*] Downloading repository archive ({format_size(size)})...")
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".archive.", suffix=".tmp")
+        os.close(fd)
+        try:
+            downloader.save(url, tmp, response=response)
+            digest = file_sha256(tmp)
+            os.replace(tmp, self._archive(digest))
+        finally:
+            if os.path.exists(tmp): os.unlink(tmp)
+        self._write_meta(url, {'url': url, 'sha256': digest, 'etag': response.headers.get('ETag'),
+                               'last_modified': response.headers.get('Last-Modified')})
+        return self._use(digest)
+
+    def evict(self):
+        """Removes the least recently used archives until the cache is under max_bytes, then sidecars left without one."""
+        archives = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.endswith(".zip"):
+                stat = os.stat(path)
+                archives.append((stat.st_mtime, stat.st_size, path))
+            elif name.endswith(".tmp") and time.time() - os.path.getmtime(path) > 3600:
+                os.unlink(path)   # Left behind by an interrupted download
+        archives.sort()
+        total = sum(a[1] for a in archives)
+        for _, size, path in archives:
+            if total <= self.max_bytes: break
+            os.unlink(path)
+            total -= size
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                meta = self._load(os.path.join(self.root, name))
+                if not meta or not os.path.exists(self._archive(meta['sha256'])):
+                    os.unlink(os.path.join(self.root, name))
+
+def open_archive_cache():
+    """The device's archive cache, or None if its directory can't be created (archives are then downloaded per install)."""
+    try:
+        return ArchiveCache(os.path.join(cache_dirs()[0], "archives"))
+    except OSError:
+        return None
+
+def fetch_archive(url, downloader, cache, sha256=None, size=None, response=None):
+    """The whole repo archive on disk, as (path, whether the caller deletes it): cached if possible, else staged."""
+    if cache:
+        return cache.get(url, downloader, sha256, size, response), False
+    path = staging_file("archive.zip")
+    try:
+        downloader.log(f"[*] Downloading repository archive ({format_size(size)})...")
+        downloader.save(url, path, response=response)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, True
+
+def fetch_zip_member(url, member, archive_size, downloader, path, archive_sha256=None, cache=None):
+    """Saves one file of a remote zip to path: from the archive cache, by Range requests, or from the whole archive."""
+    response = None
+    if not (cache and cache.has(url, archive_sha256)):
+        try:
+            downloader.log(f"[*] Fetching {member} with range requests...")
+            data = fetch_zip_member_ranged(url, member, downloader)
+            if data is not None:
+                with open(path, "wb") as f: f.write(data)
+                return
+        except RangeUnsupported as e:
+            response = e.response
+        except (requests.exceptions.RequestException, struct.error, zlib.error, ValueError):
+            pass
+    archive, temporary = fetch_archive(url, downloader, cache, archive_sha256, archive_size, response)
+    try:
+        extract_member(archive, member, path)
+    finally:
+        if temporary: os.unlink(archive)
+
+def fetch_source(plugin_data, downloader, path, cache=None):
+    """Saves the plugin file to path from where the registry found it: a member of the repo archive, or a single file."""
+    if plugin_data.get('origin_type') == 'zip':
+        fetch_zip_member(plugin_data['download_url'], plugin_data['path_inside_zip'], plugin_data.get('archive_size'),
+                         downloader, path, plugin_data.get('archive_sha256'), cache)
+        return
+    downloader.log(f"[*] Downloading file ({format_size(download_size(plugin_data))})...")
+    downloader.save(plugin_data['download_url'], path)
+
+def fetch_blob(plugin_data, downloader, path):
+    """Saves the plugin's blob to path; False if there's none or it doesn't match the record's sha256."""
+    if not plugin_data.get('blob_url') or not plugin_data.get('sha256'): return False
+    url = urljoin(get_registry_url(), plugin_data['blob_url'])
+    downloader.log(f"[*] Downloading plugin file ({format_size(plugin_data.get('size'))})...")
+    try:
+        downloader.save(url, path)
+        if file_sha256(path) == plugin_data['sha256']:
+            return True
+    except (requests.exceptions.RequestException, OSError):
+        pass
+    downloader.log(f"{YELLOW}[!] Plugin file unavailable, falling back to the original source...{RESET}")
+    return False
+
 def get_installed_plugins():
     if not os.path.exists(CUSTOM_PLUGIN_DIR):
         return []
@@ -107,14 +531,217 @@ def get_registry_url():
         pass
     return DEFAULT_REGISTRY
 
+def decoders():
+    """Registry variants this install can decode, mapped to their decoder."""
+    variants = {"plugins.min.json": lambda data: data, "plugins.min.json.gz": gzip.decompress}
+    if zstandard:
+        variants["plugins.min.json.zst"] = zstandard.ZstdDecompressor().decompress
+    return variants
+
+def cache_dirs():
+    """Cache directories to read, the one this user writes first. Root never reads another user's cache, since installs trust it."""
+    if os.geteuid() == 0: return [REGISTRY_CACHE_DIR]
+    return [USER_CACHE_DIR, REGISTRY_CACHE_DIR]
+
+def http_cache_paths(url, root):
+    key = hashlib.sha256(url.encode()).hexdigest()[:32]
+    base = os.path.join(root, "http", key)
+    return base + ".body", base + ".json"
+
+def write_cached(url, body, meta):
+    """Best effort, like save_local_registry. body None only refreshes the metadata."""
+    body_path, meta_path = http_cache_paths(url, cache_dirs()[0])
+    try:
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        if body is not None:
+            with open(body_path + ".tmp", "wb") as f: f.write(body)
+            os.replace(body_path + ".tmp", body_path)
+        with open(meta_path + ".tmp", "w") as f: json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+    except OSError:
+        pass
+
+# Age in seconds of every cached copy served without asking the server, for cache_note()
+served_from_cache = {}
+
+def cached_get(url, raw=False):
+    """GET through the device's registry cache (TTL, then revalidation); None on a 404, or a failure with nothing cached."""
+    body = meta = source = None
+    for root in cache_dirs():
+        body_path, meta_path = http_cache_paths(url, root)
+        try:
+            with open(meta_path, "r") as f: cached_meta = json.load(f)
+            with open(body_path, "rb") as f: cached_body = f.read()
+        except (OSError, ValueError):
+            continue
+        if meta is None or cached_meta['fetched_at'] > meta['fetched_at']:
+            body, meta, source = cached_body, cached_meta, root
+    age = time.time() - meta['fetched_at'] if meta else None
+    if body is not None and (OFFLINE or age < REGISTRY_TTL):
+        served_from_cache[url] = age
+        return body
+    if OFFLINE:
+        return None
+
+    headers = {}
+    if body is not None:
+        if meta.get('etag'): headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'): headers['If-Modified-Since'] = meta['last_modified']
+    try:
+        with requests.get(url, timeout=15, headers=headers, stream=True) as r:
+            if r.status_code == 304 and body is not None:
+                meta['fetched_at'] = time.time()
+                write_cached(url, None if source == cache_dirs()[0] else body, meta)
+                return body
+            if r.status_code == 404 or (r.status_code != 200 and body is None):
+                return None
+            if r.status_code != 200:
+                # A 5xx says nothing about the file, so the cached copy still stands
+                served_from_cache[url] = age
+                return body
+            data = r.raw.read(decode_content=not raw)
+    except requests.RequestException:
+        if body is None:
+            raise
+        served_from_cache[url] = age
+        return body
+    write_cached(url, data, {'url': url, 'etag': r.headers.get('ETag'),
+                             'last_modified': r.headers.get('Last-Modified'), 'fetched_at': time.time()})
+    return data
+
+def format_age(seconds):
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{int(seconds // size)}{unit}"
+    return f"{int(seconds)}s"
+
+def cache_note():
+    """Says how old the registry data is when some of it came from the cache unchecked."""
+    if served_from_cache:
+        age = max(served_from_cache.values())
+        if OFFLINE: mode = "offline"
+        elif age >= REGISTRY_TTL: mode = "store unreachable"
+        else: mode = f"refreshes after {format_age(REGISTRY_TTL)}"
+        print(f"{YELLOW}[*] Using cached registry data, {format_age(age)} old ({mode}).{RESET}")
+
+def fetch_manifest(url):
+    """plugins.manifest.json next to the registry, or None if it isn't published."""
+    try:
+        data = cached_get(url.rsplit("/", 1)[0] + "/plugins.manifest.json")
+        if data is not None:
+            return json.loads(data)
+    except Exception:
+        pass
+    return None
+
+def registry_digest(registry):
+    """sha256 of the registry serialized the way the builder writes plugins.min.json."""
+    return hashlib.sha256(json.dumps(registry, separators=(",", ":")).encode()).hexdigest()
+
+def load_local_registry(url):
+    """The newest local copy of url's registry in any readable cache, with its age in seconds."""
+    best = None
+    for root in cache_dirs():
+        path = os.path.join(root, "registry.json")
+        try:
+            with open(path, "r") as f:
+                local = json.load(f)
+            if local.get('source') == url and (best is None or (local.get('revision') or 0) > (best.get('revision') or 0)):
+                best = dict(local, age=time.time() - os.path.getmtime(path))
+        except Exception:
+            pass
+    return best
+
+def save_local_registry(url, revision, registry):
+    """Best effort: a cache directory that can't be written is just skipped."""
+    path = os.path.join(cache_dirs()[0], "registry.json")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w") as f:
+            json.dump({'source': url, 'revision': revision, 'plugins': registry}, f)
+        os.replace(path + ".tmp", path)
+    except OSError:
+        pass
+
+def fetch_patched_registry(url, manifest):
+    """Applies deltas/<rev>.json to the local copy up to the manifest's revision; None unless the result verifies."""
+    local = load_local_registry(url)
+    revision = manifest.get('revision')
+    if not local or not revision or local.get('revision') is None: return None
+    have = local['revision']
+    if have == revision:
+        return local['plugins']
+    if OFFLINE or have > revision or revision - have > MAX_DELTA_CHAIN or have + 1 < manifest.get('oldest_delta', revision + 1):
+        return None
+
+    base = url.rsplit("/", 1)[0] + "/deltas/"
+    plugins = {p['name']: p for p in local['plugins']}
+    try:
+        for rev in range(have + 1, revision + 1):
+            r = requests.get(f"{base}{rev}.json", timeout=15)
+            if r.status_code != 200: return None
+            delta = r.json()
+            if delta.get('base') != rev - 1: return None
+            for name in delta['removed']:
+                plugins.pop(name, None)
+            for p in delta['added'] + delta['changed']:
+                plugins[p['name']] = p
+    except Exception:
+        return None
+
+    registry = sorted(plugins.values(), key=lambda p: p['name'].lower())
+    if registry_digest(registry) != manifest['artifacts'].get('plugins.min.json', {}).get('sha256'):
+        return None
+    print(f"[*] Applied {revision - have} registry update(s), now at revision {revision}")
+    save_local_registry(url, revision, registry)
+    return registry
+
+def fetch_compact_registry(url, manifest):
+    """Downloads the smallest registry variant we can decode and verifies it; None to fall back to plugins.json."""
+    base = url.rsplit("/", 1)[0] + "/"
+    try:
+        artifacts = manifest['artifacts']
+        available = decoders()
+        candidates = sorted((artifacts[name]['size'], name) for name in available if name in artifacts)
+        if not candidates: return None
+        size, name = candidates[0]
+
+        r = requests.get(base + name, timeout=15, stream=True)
+        if r.status_code != 200: return None
+        # Raw bytes as stored, even if the server also applied a Content-Encoding
+        data = r.raw.read(decode_content=False)
+        if len(data) != size or hashlib.sha256(data).hexdigest() != artifacts[name]['sha256']:
+            print(f"{YELLOW}[!] {name} failed verification, using plugins.json{RESET}")
+            return None
+        return json.loads(available[name](data))
+    except Exception:
+        return None
+
 def fetch_registry():
     url = get_registry_url()
+    manifest = fetch_manifest(url)
+    if manifest:
+        registry = fetch_patched_registry(url, manifest)
+        if registry is None and not OFFLINE:
+            registry = fetch_compact_registry(url, manifest)
+            if registry is not None and manifest.get('revision'):
+                save_local_registry(url, manifest['revision'], registry)
+        if registry is not None:
+            return registry
     try:
-        r = requests.get(url, timeout=15)
-        if r.status_code != 200:
-            print(f"{RED}[!] Could not connect to store (Status: {r.status_code}){RESET}")
+        data = cached_get(url)
+        if data is None:
+            local = load_local_registry(url)
+            if local:
+                # No manifest or plugins.json to go by, but an older full copy is on disk
+                served_from_cache[url] = local['age']
+                return local['plugins']
+            if OFFLINE:
+                print(f"{RED}[!] The registry isn't cached yet. Run this command once while online.{RESET}")
+            else:
+                print(f"{RED}[!] Could not connect to store.{RESET}")
             sys.exit(1)
-        return r.json()
+        return json.loads(data)
     except requests.exceptions.ConnectionError:
         print(f"{RED}[!] No Internet Connection Detected.{RESET}")
         print(f"    Please connect your Pwnagotchi to the internet.")
@@ -124,6 +751,77 @@ def fetch_registry():
         print(f"{RED}[!] Connection failed: {e}{RESET}")
         sys.exit(1)
 
+def fetch_shard(path):
+    """One file of the sharded registry, or None so callers fall back to the full registry."""
+    url = get_registry_url().rsplit("/", 1)[0] + "/registry/" + path
+    try:
+        data = cached_get(url)
+        if data is not None:
+            return json.loads(data)
+    except Exception:
+        pass
+    return None
+
+def fetch_index():
+    """Name, version, category and author of every plugin."""
+    index = fetch_shard("index.json")
+    if index is None:
+        index = fetch_registry()
+    return index
+
+def fetch_plugin(name):
+    """The full registry record for one plugin, or None if it doesn't exist."""
+    plugin = fetch_shard(f"plugins/{name}.json")
+    if plugin is None:
+        plugin = next((p for p in fetch_registry() if p['name'] == name), None)
+    return plugin
+
+def fetch_search_index():
+    """The prebuilt search index (gzipped if available), or None."""
+    url = get_registry_url().rsplit("/", 1)[0] + "/registry/search.json.gz"
+    try:
+        data = cached_get(url, raw=True)
+        if data is not None:
+            return json.loads(gzip.decompress(data))
+    except Exception:
+        pass
+    return fetch_shard("search.json")
+
+def search_grams(word):
+    """Trigrams of a word anchored at its start; must match the builder's."""
+    padded = "_" + word
+    return {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+
+def rank_search(index, query, limit=None):
+    """Plugins matching every word of query, best first (at most limit), using the prebuilt index."""
+    words = re.findall(r"[a-z0-9]+", query.lower())
+    if not words: return []
+    scores = None
+    for word in words:
+        grams = search_grams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(index['trigrams'].get(gram, ()))
+        need = SEARCH_MIN_SIMILARITY * len(grams)
+        matches = []
+        for token, count in shared.items():
+            if count >= need:
+                similarity = EXACT_WORD_BONUS if token == word else count / len(grams)
+                for field, weight in enumerate(index['weights']):
+                    matches.append((weight * similarity, index['tokens'][token][field]))
+        # Apply weakest first so each doc ends up with its best match for this word
+        best = {}
+        for score, docs in sorted(matches, key=lambda m: m[0]):
+            best.update(dict.fromkeys(docs, score))
+        scores = best if scores is None else {doc: scores[doc] + s for doc, s in best.items() if doc in scores}
+        if not scores: return []
+
+    docs = index['docs']
+    # Docs are stored in name order, so a stable sort by score keeps ties alphabetical
+    ranked = sorted(scores)
+    ranked.sort(key=scores.__getitem__, reverse=True)
+    return [dict(zip(index['doc_fields'], docs[doc])) for doc in ranked[:limit]]
+
 def clean_author_name(author):
     """Removes emails, URLs, and numeric IDs for clean display."""
     if not author or author == 'Unknown':
@@ -150,7 +848,8 @@ def clean_author_name(author):
 
 def list_plugins(args):
     print(f"[*] Fetching plugin list...")
-    registry = fetch_registry()
+    registry = fetch_index()
+    cache_note()
     installed = get_installed_plugins()
     
     # NEW WIDER TABLE HEADERS
@@ -173,6 +872,7 @@ def list_plugins(args):
 def list_sources(args):
     print(f"[*] Analyzing repository sources...")
     registry = fetch_registry()
+    cache_note()
     sources = {} 
 
     for p in registry:
@@ -197,11 +897,15 @@ def list_sources(args):
 
 def search_plugins(args):
     print(f"[*] Searching for '{args.query}'...")
-    registry = fetch_registry()
+    index = fetch_search_index()
     installed = get_installed_plugins()
     
-    query = args.query.lower()
-    results = [p for p in registry if query in p['name'].lower() or query in p['description'].lower()]
+    if index:
+        results = rank_search(index, args.query)
+    else:
+        query = args.query.lower()
+        results = [p for p in fetch_registry() if query in p['name'].lower() or query in p['description'].lower()]
+    cache_note()
     
     if not results:
         print(f"{YELLOW}[!] No plugins found matching '{args.query}'{RESET}")
@@ -227,8 +931,8 @@ def search_plugins(args):
 def show_info(args):
     if not is_safe_name(args.name): return
     target_name = args.name
-    registry = fetch_registry()
-    plugin_data = next((p for p in registry if p['name'] == target_name), None)
+    plugin_data = fetch_plugin(target_name)
+    cache_note()
     
     if not plugin_data:
         print(f"{RED}[!] Plugin '{target_name}' not found.{RESET}")
@@ -238,6 +942,9 @@ def show_info(args):
     print(f"Author:      {plugin_data['author']}")
     print(f"Version:     {plugin_data['version']}")
     print(f"Category:    {plugin_data.get('category', 'General')}")
+    if download_size(plugin_data) is not None:
+        source = "repository archive" if plugin_data.get('origin_type') == 'zip' and not plugin_data.get('blob_url') else "single file"
+        print(f"Download:    {format_size(download_size(plugin_data))} ({source})")
     print(f"\n{YELLOW}Description:{RESET}")
     print(plugin_data['description'])
     print(f"\n{YELLOW}Download URL:{RESET}")
@@ -321,9 +1028,9 @@ def compare_versions(v1, v2):
 def update_plugins(args):
     check_sudo()
     print(f"[*] Checking for plugin updates...")
-    registry = fetch_registry()
+    registry = fetch_index()
     installed_files = [f for f in os.listdir(CUSTOM_PLUGIN_DIR) if f.endswith(".py")]
-    updates_found = []
+    outdated = {}
 
     for filename in installed_files:
         plugin_name = filename.replace(".py", "")
@@ -331,82 +1038,189 @@ def update_plugins(args):
         
         if remote_data:
             local_ver = get_local_version(os.path.join(CUSTOM_PLUGIN_DIR, filename))
-            remote_ver = remote_data['version']
-            
             # Only show if remote is NEWER than local (comparison = 1 means remote is newer)
-            if compare_versions(remote_ver, local_ver) > 0:
-                updates_found.append({"name": plugin_name, "local": local_ver, "remote": remote_ver})
+            if compare_versions(remote_data['version'], local_ver) > 0:
+                outdated[plugin_name] = (local_ver, remote_data)
+
+    updates_found = []
+    details = resolve_plugins(list(outdated)) if outdated else {}
+    for plugin_name, (local_ver, remote_data) in outdated.items():
+        data = details.get(plugin_name) or remote_data
+        # Same bytes already installed (e.g. only the version string parsing differs): nothing to fetch
+        if data.get('sha256') and data['sha256'] == file_sha256(os.path.join(CUSTOM_PLUGIN_DIR, f"{plugin_name}.py")):
+            continue
+        updates_found.append({"name": plugin_name, "local": local_ver, "remote": remote_data['version'], "data": data})
 
     if not updates_found:
         print(f"{GREEN}[+] All plugins are up to date.{RESET}")
         return
 
     print(f"\n{YELLOW}Updates available:{RESET}")
+    downloads = {}
     for u in updates_found:
-        print(f"  • {CYAN}{u['name']}{RESET}: v{u['local']} -> v{u['remote']}")
+        size = download_size(u['data'])
+        downloads[u['data'].get('blob_url') or u['data'].get('download_url')] = size
+        print(f"  • {CYAN}{u['name']}{RESET}: v{u['local']} -> v{u['remote']} ({format_size(size)})")
+    if None not in downloads.values():
+        print(f"  Total download: {format_size(sum(downloads.values()))}")
 
     print(f"\n{YELLOW}Do you want to upgrade these {len(updates_found)} plugins? (Y/n){RESET}")
     try: choice = input().lower()
     except KeyboardInterrupt: return
     
     if choice == 'y' or choice == '':
-        for u in updates_found:
-            class MockArgs: name = u['name']
-            print(f"\n[*] Upgrading {u['name']}...")
-            install_plugin(MockArgs())
+        install_plugins([(u['name'], u['data']) for u in updates_found], args.jobs)
         print(f"\n{GREEN}[+] Upgrade complete! Please restart Pwnagotchi.{RESET}")
     else: print("[*] Cancelled.")
 
+def resolve_plugins(names):
+    """Registry records for names (None if missing): the plugin's shard for one, the full registry fetched once for several."""
+    if len(names) == 1:
+        return {names[0]: fetch_plugin(names[0])}
+    registry = {p['name']: p for p in fetch_registry()}
+    return {name: registry.get(name) for name in names}
+
 def install_plugin(args):
     check_sudo()
-    if not is_safe_name(args.name): return
-    target_name = args.name
-    registry = fetch_registry()
-    plugin_data = next((p for p in registry if p['name'] == target_name), None)
-    
-    if not plugin_data:
-        print(f"{RED}[!] Plugin '{target_name}' not found in registry.{RESET}")
-        return
+    names = []
+    for name in dict.fromkeys(args.names):
+        if is_safe_name(name): names.append(name)
+        else: print(f"{RED}[!] Invalid plugin name '{name}'.{RESET}")
+    if not names: return
+    records = resolve_plugins(names)
+    plugins = []
+    for name in names:
+        if records[name]: plugins.append((name, records[name]))
+        else: print(f"{RED}[!] Plugin '{name}' not found in registry.{RESET}")
+    if plugins: install_plugins(plugins, args.jobs)
 
-    # Check if already installed
-    final_file_path = os.path.join(CUSTOM_PLUGIN_DIR, f"{target_name}.py")
-    already_installed = os.path.exists(final_file_path)
-    
-    if already_installed:
-        print(f"{YELLOW}[!] Plugin '{target_name}' is already installed.{RESET}")
-        print(f"{YELLOW}[*] Reinstalling (will update config if needed)...{RESET}")
+def install_plugins(plugins, jobs=DOWNLOAD_JOBS):
+    """Installs (name, registry record) pairs in one batch of parallel downloads; returns the names installed."""
+    installed, enable, new = [], [], []
+    singles, by_archive = [], {}
+    cache = open_archive_cache()
 
-    print(f"[*] Installing {CYAN}{target_name}{RESET} by {plugin_data['author']}...")
+    for name, plugin_data in plugins:
+        dest = os.path.join(CUSTOM_PLUGIN_DIR, f"{name}.py")
+        already_installed = os.path.exists(dest)
+        if already_installed:
+            print(f"{YELLOW}[!] Plugin '{name}' is already installed.{RESET}")
+            if plugin_data.get('sha256') and file_sha256(dest) == plugin_data['sha256']:
+                print(f"{GREEN}[+] Installed file matches the registry (sha256), skipping download.{RESET}")
+                enable.append(name)
+                continue
+            print(f"{YELLOW}[*] Reinstalling (will update config if needed)...{RESET}")
 
-    try:
+        print(f"[*] Installing {CYAN}{name}{RESET} by {plugin_data['author']}...")
         if plugin_data.get('origin_type') == 'zip':
-            print(f"[*] Downloading repository archive...")
-            r = requests.get(plugin_data['download_url'], timeout=30)
-            z = zipfile.ZipFile(io.BytesIO(r.content))
             target_path = plugin_data['path_inside_zip']
-            if ".." in target_path or target_path.startswith("/"): return
-            print(f"[*] Extracting {target_path}...")
-            if not os.path.exists(CUSTOM_PLUGIN_DIR): os.makedirs(CUSTOM_PLUGIN_DIR)
-            with z.open(target_path) as source, open(final_file_path, "wb") as dest:
-                shutil.copyfileobj(source, dest)
+            if ".." in target_path or target_path.startswith("/"): continue
+        member = (name, plugin_data, dest, already_installed)
+        if plugin_data.get('origin_type') == 'zip' and not plugin_data.get('blob_url'):
+            by_archive.setdefault(plugin_data['download_url'], []).append(member)
+        else:
+            singles.append(member)
+
+    def fetch_single(name, plugin_data):
+        path = staging_file(f"{name}.py")
+        try:
+            if not fetch_blob(plugin_data, downloader, path):
+                fetch_source(plugin_data, downloader, path, cache)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    def fetch_group(url, members):
+        # Several members of one archive: one full download beats a set of range requests per member
+        archive, temporary = fetch_archive(url, downloader, cache, members[0][1].get('archive_sha256'), members[0][1].get('archive_size'))
+        files = {}
+        try:
+            for name, plugin_data, _, _ in members:
+                files[name] = staging_file(f"{name}.py")
+                try:
+                    extract_member(archive, plugin_data['path_inside_zip'], files[name])
+                except KeyError:
+                    os.unlink(files[name])
+                    files[name] = ValueError(f"{plugin_data['path_inside_zip']} is not in the archive")
+        except BaseException:
+            for path in files.values():
+                if isinstance(path, str): os.unlink(path)
+            raise
+        finally:
+            if temporary: os.unlink(archive)
+        return files
+
+    # Each download: (members it installs, work returning {name: downloaded file or the error})
+    downloads = [([m], lambda m=m: {m[0]: fetch_single(m[0], m[1])}) for m in singles]
+    expected = [download_size(m[1]) for m in singles]
+    for url, members in by_archive.items():
+        size, archive_size = members[0][1].get('size'), members[0][1].get('archive_size')
+        if len(members) == 1:
+            downloads.append((members, lambda m=members[0]: {m[0]: fetch_single(m[0], m[1])}))
+        else:
+            downloads.append((members, lambda url=url, members=members: fetch_group(url, members)))
+        if cache and cache.has(url, members[0][1].get('archive_sha256')):
+            expected.append(0)
+        elif len(members) == 1:
+            # A lone member usually comes over Range requests: the archive's tail, then the member
+            expected.append(min(size + RANGE_TAIL_BYTES, archive_size) if size and archive_size else None)
         else:
-            print(f"[*] Downloading file...")
-            r = requests.get(plugin_data['download_url'], timeout=30)
-            if not os.path.exists(CUSTOM_PLUGIN_DIR): os.makedirs(CUSTOM_PLUGIN_DIR)
-            with open(final_file_path, "wb") as f: f.write(r.content)
+            expected.append(archive_size)
 
-        print(f"{GREEN}[+] Successfully installed to {final_file_path}{RESET}")
-        update_config(target_name, enable=True)
+    downloader = Downloader(jobs, None if None in expected else sum(expected))
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            pending = {pool.submit(work): members for members, work in downloads}
+            for future in as_completed(pending):
+                members = pending[future]
+                try:
+                    files = future.result()
+                except Exception as e:
+                    downloader.log(f"{RED}[!] Installation of {', '.join(m[0] for m in members)} failed: {e}{RESET}")
+                    continue
+                for name, plugin_data, dest, already_installed in members:
+                    try:
+                        if isinstance(files[name], Exception): raise files[name]
+                        os.replace(files[name], dest)
+                    except Exception as e:
+                        if isinstance(files[name], str) and os.path.exists(files[name]): os.unlink(files[name])
+                        downloader.log(f"{RED}[!] Installation of {name} failed: {e}{RESET}")
+                        continue
+                    downloader.log(f"{GREEN}[+] Successfully installed to {dest}{RESET}")
+                    if plugin_data.get('sha256') and file_sha256(dest) != plugin_data['sha256']:
+                        downloader.log(f"{YELLOW}[!] Installed file differs from the registry record (upstream changed since the last build).{RESET}")
+                    installed.append(name)
+                    enable.append(name)
+                    if not already_installed: new.append((name, plugin_data, dest))
+    finally:
+        downloader.close()
+        if cache:
+            try: cache.evict()
+            except OSError: pass
+
+    # Downloads finish in any order; report in the order asked for
+    order = {name: i for i, (name, _) in enumerate(plugins)}
+    enable.sort(key=order.get)
+    new.sort(key=lambda n: order[n[0]])
+
+    if enable: update_config(enable, enable=True)
         
-        # Smart Config Scan (only show on first install, not reinstall)
-        if not already_installed:
-            params = scan_for_config_params(final_file_path, target_name)
-            if params:
-                print(f"\n{YELLOW}[!] CONFIGURATION REQUIRED:{RESET}")
-                print(f"This plugin references the following options. Add them to config.toml:")
-                for p in params: print(f"  main.plugins.{target_name}.{p} = \"...\"")
-            
-    except Exception as e: print(f"{RED}[!] Installation failed: {e}{RESET}")
+    # Smart Config Scan (only show on first install, not reinstall)
+    for name, plugin_data, dest in new:
+        # Registries built with config_schema already list the options; older ones need a scan
+        schema = plugin_data.get('config_schema')
+        if schema is None:
+            schema = [{'key': p} for p in scan_for_config_params(dest, name)]
+        if schema:
+            print(f"\n{YELLOW}[!] CONFIGURATION REQUIRED:{RESET}")
+            print(f"This plugin references the following options. Add them to config.toml:")
+            for field in schema:
+                hint = f"  main.plugins.{name}.{field['key']} = \"{field.get('default', '...')}\""
+                if field.get('options'):
+                    hint += f"  # {' | '.join(field['options'])}"
+                print(hint)
+    return installed
 
 def uninstall_plugin(args):
     check_sudo()
@@ -423,47 +1237,54 @@ def uninstall_plugin(args):
         remove_plugin_config(target_name)
     except Exception as e: print(f"{RED}[!] Error: {e}{RESET}")
 
-def update_config(plugin_name, enable=True):
-    """Updates config.toml, preventing duplicates with exact key matching."""
+def update_config(plugin_names, enable=True):
+    """Updates config.toml for one plugin name or a list of them in a single write, preventing duplicates with exact key matching."""
+    if isinstance(plugin_names, str): plugin_names = [plugin_names]
     try:
         with open(CONFIG_FILE, "r") as f: 
             lines = f.readlines()
         
         new_lines = []
-        found = False
-        config_key = f"main.plugins.{plugin_name}.enabled"
+        found = set()
+        config_keys = {f"main.plugins.{name}.enabled": name for name in plugin_names}
         
         # Use regex for EXACT matching (not substring)
         # This pattern matches: main.plugins.PLUGINNAME.enabled = true/false
         # It won't match comments or other lines containing the key
-        pattern = re.compile(rf"^\s*{re.escape(config_key)}\s*=\s*(true|false)\s*$")
+        pattern = re.compile(r"^\s*(main\.plugins\.[a-zA-Z0-9_-]+\.enabled)\s*=\s*(true|false)\s*$")
         
         for line in lines:
-            if pattern.match(line.strip()):
+            match = pattern.match(line.strip())
+            if match and match.group(1) in config_keys:
                 # Found existing config line
-                if not found:  # Only update the FIRST occurrence
-                    found = True
+                config_key = match.group(1)
+                if config_key not in found:  # Only update the FIRST occurrence
+                    found.add(config_key)
                     new_lines.append(f"{config_key} = {'true' if enable else 'false'}\n")
                 # If we find duplicates, skip them (this cleans up existing dupes)
             else:
                 new_lines.append(line)
         
-        # Only add new entry if not found AND we're enabling
-        if not found and enable:
+        # Only add new entries if not found AND we're enabling
+        missing = [key for key in config_keys if key not in found]
+        if missing and enable:
             # Ensure file ends with newline before adding
             if new_lines and not new_lines[-1].endswith('\n'): 
                 new_lines[-1] += '\n'
-            new_lines.append(f"\n{config_key} = true\n")
+            new_lines.append("\n")
+            new_lines.extend(f"{key} = true\n" for key in missing)
 
         # Write back to file
         with open(CONFIG_FILE, "w") as f: 
             f.writelines(new_lines)
         
         state = "Enabled" if enable else "Disabled"
-        if found:
-            print(f"{GREEN}[+] Plugin {state} in config.toml (already existed, updated). Restart required.{RESET}")
-        else:
-            print(f"{GREEN}[+] Plugin {state} in config.toml (new entry). Restart required.{RESET}")
+        for config_key, name in config_keys.items():
+            prefix = f"Plugin {name}" if len(config_keys) > 1 else "Plugin"
+            if config_key in found:
+                print(f"{GREEN}[+] {prefix} {state} in config.toml (already existed, updated). Restart required.{RESET}")
+            else:
+                print(f"{GREEN}[+] {prefix} {state} in config.toml (new entry). Restart required.{RESET}")
             
     except Exception as e: 
         print(f"{YELLOW}[!] Config update failed: {e}{RESET}")
@@ -497,30 +1318,40 @@ def remove_plugin_config(plugin_name):
         print(f"{YELLOW}[!] Config cleanup failed: {e}{RESET}")
 
 def main():
+    global OFFLINE, REGISTRY_TTL
     banner()
     parser = argparse.ArgumentParser(description="Pwnagotchi Plugin Manager")
     subparsers = parser.add_subparsers()
-    parser_list = subparsers.add_parser('list', help='List all available plugins')
+    # Read-only commands can run from the registry cache alone
+    cache_options = argparse.ArgumentParser(add_help=False)
+    cache_options.add_argument('--offline', action='store_true', help='Use only the cached registry, never the network')
+    cache_options.add_argument('--ttl', type=int, default=REGISTRY_TTL, help='Seconds cached registry data is used before revalidating (default: %(default)s)')
+    parser_list = subparsers.add_parser('list', help='List all available plugins', parents=[cache_options])
     parser_list.set_defaults(func=list_plugins)
-    parser_sources = subparsers.add_parser('sources', help='List repository sources')
+    parser_sources = subparsers.add_parser('sources', help='List repository sources', parents=[cache_options])
     parser_sources.set_defaults(func=list_sources)
-    parser_search = subparsers.add_parser('search', help='Search for a plugin')
+    parser_search = subparsers.add_parser('search', help='Search for a plugin', parents=[cache_options])
     parser_search.add_argument('query', type=str, help='Search term')
     parser_search.set_defaults(func=search_plugins)
-    parser_info = subparsers.add_parser('info', help='Show details about a plugin')
+    parser_info = subparsers.add_parser('info', help='Show details about a plugin', parents=[cache_options])
     parser_info.add_argument('name', type=str, help='Name of the plugin')
     parser_info.set_defaults(func=show_info)
-    parser_install = subparsers.add_parser('install', help='Install a plugin')
-    parser_install.add_argument('name', type=str, help='Name of the plugin')
+    download_options = argparse.ArgumentParser(add_help=False)
+    download_options.add_argument('-j', '--jobs', type=int, default=DOWNLOAD_JOBS, help='Downloads to run at once (default: %(default)s)')
+    parser_install = subparsers.add_parser('install', help='Install a plugin', parents=[download_options])
+    parser_install.add_argument('names', nargs='+', metavar='name', help='Name of the plugin (several can be given)')
     parser_install.set_defaults(func=install_plugin)
     parser_uninstall = subparsers.add_parser('uninstall', help='Uninstall a plugin')
     parser_uninstall.add_argument('name', type=str, help='Name of the plugin')
     parser_uninstall.set_defaults(func=uninstall_plugin)
     parser_upgrade = subparsers.add_parser('upgrade', help='Upgrade PwnStore tool to latest version')
     parser_upgrade.set_defaults(func=upgrade_tool)
-    parser_update = subparsers.add_parser('update', help='Update all installed plugins to latest versions')
+    parser_update = subparsers.add_parser('update', help='Update all installed plugins to latest versions', parents=[download_options])
     parser_update.set_defaults(func=update_plugins)
     args = parser.parse_args()
+    OFFLINE = getattr(args, 'offline', False)
+    # Installs and updates always revalidate, so they never act on a stale record
+    REGISTRY_TTL = getattr(args, 'ttl', 0)
     if hasattr(args, 'func'): args.func(args)
     else: parser.print_help()
 
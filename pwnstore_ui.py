@@ -11,6 +11,11 @@ import json
 import subprocess
 import requests
 import os
+import re
+import gzip
+import hashlib
+import time
+from collections import Counter
 from flask import render_template_string, request, jsonify, Response
 
 import pwnagotchi.plugins as plugins
@@ -23,6 +28,17 @@ try:
 except ImportError:
     CSRF_AVAILABLE = False
 
+# Optional: lets the registry download use the smaller .zst variant
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Ranked search over registry/search.json (same scoring as the CLI)
+SEARCH_INDEX_TTL = 600        # Seconds the downloaded index is reused
+SEARCH_MIN_SIMILARITY = 0.5   # Share of a query word's trigrams a field must contain to match
+EXACT_WORD_BONUS = 1.5        # Whole-word hits rank above partial/fuzzy ones
+
 
 class PwnStoreUI(plugins.Plugin):
     __author__ = 'WPA2'
@@ -33,6 +49,9 @@ class PwnStoreUI(plugins.Plugin):
     def __init__(self):
         self.ready = False
         self.store_url = "https://raw.githubusercontent.com/wpa-2/pwnagotchi-store/main/plugins.json"
+        self.shard_url = self.store_url.rsplit("/", 1)[0] + "/registry/"
+        self.search_index = None
+        self.search_loaded = 0
         
     def on_loaded(self):
         logging.info("[pwnstore_ui] Plugin loaded")
@@ -46,9 +65,13 @@ class PwnStoreUI(plugins.Plugin):
             html = self._render_store()
             return Response(html, mimetype='text/html')
         
-        # API endpoint to fetch plugins
+        # API endpoint to fetch plugins (optionally a single category)
         elif path == "api/plugins":
-            return self._get_plugins()
+            return self._get_plugins(request.args.get('category'))
+        
+        # API endpoint for ranked, typo-tolerant search
+        elif path == "api/search":
+            return self._search(request.args.get('q', ''), request.args.get('limit', type=int))
         
         # API endpoint to install plugin
         elif path == "api/install":
@@ -585,9 +608,12 @@ class PwnStoreUI(plugins.Plugin):
 
     <script>
         let allPlugins = [];
+        let pluginCache = {};  // category -> plugins, so each shard is fetched once
         let installedPlugins = [];
         let currentCategory = 'all';
         let searchTerm = '';
+        let searchRank = null;  // name -> position from api/search; null means plain substring filtering
+        let searchTimer = null;
 
         // Get CSRF token from meta tag
         function getCSRFToken() {
@@ -627,11 +653,24 @@ class PwnStoreUI(plugins.Plugin):
             }
         }
 
+        // Load one category's plugins (or all of them), fetching only the shard needed
+        async function loadCategory(category) {
+            if (!pluginCache[category]) {
+                if (pluginCache['all']) {
+                    pluginCache[category] = pluginCache['all'].filter(p => p.category === category);
+                } else {
+                    const query = category === 'all' ? '' : `?category=${encodeURIComponent(category)}`;
+                    pluginCache[category] = await apiRequest('/plugins/pwnstore_ui/api/plugins' + query);
+                }
+            }
+            allPlugins = pluginCache[category];
+        }
+
         // Load plugins and installed list
         async function loadData() {
             try {
                 // Load plugins from store
-                allPlugins = await apiRequest('/plugins/pwnstore_ui/api/plugins');
+                await loadCategory(currentCategory);
 
                 // Load installed plugins
                 installedPlugins = await apiRequest('/plugins/pwnstore_ui/api/installed');
@@ -649,12 +688,15 @@ class PwnStoreUI(plugins.Plugin):
             // Filter plugins
             let filtered = allPlugins.filter(plugin => {
                 const matchesCategory = currentCategory === 'all' || plugin.category === currentCategory;
-                const matchesSearch = !searchTerm || 
+                const matchesSearch = !searchTerm || (searchRank ? searchRank.has(plugin.name) :
                     plugin.name.toLowerCase().includes(searchTerm) ||
                     plugin.description.toLowerCase().includes(searchTerm) ||
-                    plugin.author.toLowerCase().includes(searchTerm);
+                    plugin.author.toLowerCase().includes(searchTerm));
                 return matchesCategory && matchesSearch;
             });
+            if (searchTerm && searchRank) {
+                filtered.sort((a, b) => searchRank.get(a.name) - searchRank.get(b.name));
+            }
 
             // Update stats
             document.getElementById('pluginCount').textContent = 
@@ -1064,13 +1106,32 @@ ${plugin.description || 'No description available'}
                 document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
                 btn.classList.add('active');
                 currentCategory = btn.dataset.category;
-                renderPlugins();
+                loadCategory(currentCategory)
+                    .then(renderPlugins)
+                    .catch(error => showMessage('Failed to load plugins: ' + error.message, 'error'));
             });
         });
 
+        // Ranked search runs on the device against the prebuilt index, debounced per keystroke
         document.getElementById('searchBox').addEventListener('input', (e) => {
             searchTerm = e.target.value.toLowerCase();
-            renderPlugins();
+            clearTimeout(searchTimer);
+            if (!searchTerm) {
+                searchRank = null;
+                renderPlugins();
+                return;
+            }
+            searchTimer = setTimeout(async () => {
+                const term = searchTerm;
+                try {
+                    const results = await apiRequest('/plugins/pwnstore_ui/api/search?q=' + encodeURIComponent(term));
+                    if (term !== searchTerm) return;
+                    searchRank = new Map(results.map((plugin, i) => [plugin.name, i]));
+                } catch (error) {
+                    searchRank = null;
+                }
+                renderPlugins();
+            }, 150);
         });
 
         // Initial load
@@ -1081,16 +1142,119 @@ ${plugin.description || 'No description available'}
         """
         return html.replace('__CSRF_TOKEN__', csrf_token)
 
-    def _get_plugins(self):
-        """Fetch plugins from GitHub registry"""
+    def _get_plugins(self, category=None):
+        """Fetch plugins from GitHub registry, using the category shard when only one category is wanted"""
         try:
-            response = requests.get(self.store_url, timeout=10)
-            plugins_data = response.json()
+            if category and re.match(r'^[a-zA-Z0-9_-]+$', category):
+                try:
+                    response = requests.get(f"{self.shard_url}categories/{category}.json", timeout=10)
+                    if response.status_code == 200:
+                        return Response(json.dumps(response.json()), mimetype='application/json')
+                    # No shard: older registry or an empty category, so filter the full file below
+                except (requests.RequestException, ValueError) as e:
+                    logging.debug(f"[pwnstore_ui] Category shard unavailable: {e}")
+
+            plugins_data = self._fetch_registry()
+            if category:
+                plugins_data = [p for p in plugins_data if p.get('category') == category]
             return Response(json.dumps(plugins_data), mimetype='application/json')
         except Exception as e:
             logging.error(f"[pwnstore_ui] Failed to fetch plugins: {e}")
             return Response(json.dumps([]), mimetype='application/json', status=500)
 
+    def _fetch_registry(self):
+        """
+        Download the full registry, preferring the smallest precompressed variant
+        listed in plugins.manifest.json and verifying it against the manifest.
+        Falls back to plain plugins.json.
+        """
+        base = self.store_url.rsplit("/", 1)[0] + "/"
+        decoders = {"plugins.min.json": lambda data: data, "plugins.min.json.gz": gzip.decompress}
+        if zstandard:
+            decoders["plugins.min.json.zst"] = zstandard.ZstdDecompressor().decompress
+        try:
+            response = requests.get(base + "plugins.manifest.json", timeout=10)
+            if response.status_code == 200:
+                artifacts = response.json()['artifacts']
+                candidates = sorted((artifacts[name]['size'], name) for name in decoders if name in artifacts)
+                if candidates:
+                    size, name = candidates[0]
+                    response = requests.get(base + name, timeout=10, stream=True)
+                    data = response.raw.read(decode_content=False)
+                    if response.status_code == 200 and len(data) == size and hashlib.sha256(data).hexdigest() == artifacts[name]['sha256']:
+                        return json.loads(decoders[name](data))
+                    logging.warning(f"[pwnstore_ui] {name} failed verification, using plugins.json")
+        except Exception as e:
+            logging.debug(f"[pwnstore_ui] Compressed registry unavailable: {e}")
+
+        response = requests.get(self.store_url, timeout=10)
+        return response.json()
+
+    def _get_search_index(self):
+        """Download registry/search.json(.gz), reusing it for SEARCH_INDEX_TTL seconds"""
+        if self.search_index is not None and time.time() - self.search_loaded < SEARCH_INDEX_TTL:
+            return self.search_index
+        for name in ("search.json.gz", "search.json"):
+            try:
+                response = requests.get(self.shard_url + name, timeout=10, stream=True)
+                if response.status_code != 200:
+                    continue
+                data = response.raw.read(decode_content=False)
+                self.search_index = json.loads(gzip.decompress(data) if name.endswith(".gz") else data)
+                self.search_loaded = time.time()
+                return self.search_index
+            except Exception as e:
+                logging.debug(f"[pwnstore_ui] Search index {name} unavailable: {e}")
+        return None
+
+    def _rank_search(self, index, query, limit=None):
+        """Expand each query word to indexed words sharing its trigrams; every word must match, best weighted matches first"""
+        words = re.findall(r"[a-z0-9]+", query.lower())
+        if not words:
+            return []
+        scores = None
+        for word in words:
+            padded = "_" + word
+            grams = {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+            shared = Counter()
+            for gram in grams:
+                shared.update(index['trigrams'].get(gram, ()))
+            need = SEARCH_MIN_SIMILARITY * len(grams)
+            matches = []
+            for token, count in shared.items():
+                if count >= need:
+                    similarity = EXACT_WORD_BONUS if token == word else count / len(grams)
+                    for field, weight in enumerate(index['weights']):
+                        matches.append((weight * similarity, index['tokens'][token][field]))
+            # Apply weakest first so each doc ends up with its best match for this word
+            best = {}
+            for score, docs in sorted(matches, key=lambda m: m[0]):
+                best.update(dict.fromkeys(docs, score))
+            scores = best if scores is None else {doc: scores[doc] + s for doc, s in best.items() if doc in scores}
+            if not scores:
+                return []
+
+        docs = index['docs']
+        # Docs are stored in name order, so a stable sort by score keeps ties alphabetical
+        ranked = sorted(scores)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        return [dict(zip(index['doc_fields'], docs[doc])) for doc in ranked[:limit]]
+
+    def _search(self, query, limit=None):
+        """Search plugins, ranked via the prebuilt index or by substring if it isn't published"""
+        try:
+            index = self._get_search_index()
+            if index is not None:
+                results = self._rank_search(index, query, limit)
+            else:
+                query = query.lower()
+                results = [p for p in self._fetch_registry()
+                           if query in p['name'].lower() or query in p['description'].lower() or query in p['author'].lower()][:limit]
+            return Response(json.dumps(results), mimetype='application/json')
+        except Exception as e:
+            logging.error(f"[pwnstore_ui] Search failed: {e}")
+            return Response(json.dumps([]), mimetype='application/json', status=500)
+
     def _get_installed(self):
         """Get list of installed plugins"""
         try:
@@ -1115,12 +1279,42 @@ ${plugin.description || 'No description available'}
         """
         # First, get basic hints from CLI output
         basic_hints = self._extract_cli_hints(cli_output, plugin_name)
-        
-        # Parse plugin file for intelligent detection
+        if not basic_hints:
+            return []
+
+        # The registry record carries a schema analysed at build time
+        schema = self._get_config_schema(plugin_name)
+        if schema is not None:
+            return self._schema_hints(schema, basic_hints)
+
+        # Older registries: parse plugin file for intelligent detection
         enhanced_hints = self._parse_plugin_file(plugin_name, basic_hints)
         
         return enhanced_hints
 
+    def _get_config_schema(self, plugin_name):
+        """config_schema from the plugin's registry shard, or None when the registry predates it"""
+        try:
+            response = requests.get(f"{self.shard_url}plugins/{plugin_name}.json", timeout=10)
+            if response.status_code == 200:
+                return response.json().get('config_schema')
+        except (requests.RequestException, ValueError) as e:
+            logging.debug(f"[pwnstore_ui] Plugin shard unavailable: {e}")
+        return None
+
+    def _schema_hints(self, schema, field_names):
+        """Form fields for the requested keys: name-based hints overlaid with the schema"""
+        by_key = {field['key']: field for field in schema}
+        result = []
+        for field_name in field_names:
+            config = self._detect_field_type(field_name)
+            config.update(by_key.get(field_name, {}))
+            if config['type'] == 'multiselect':
+                config['help'] = 'Select multiple (comma-separated)'
+            config['required'] = True
+            result.append(config)
+        return result
+
     def _extract_cli_hints(self, cli_output, plugin_name):
         """Extract basic field names from CLI output"""
         hints = []